@@ -0,0 +1,40 @@
+"""
+Run background jobs (AI generate-and-save) outside the API processes.
+
+    python ai_worker.py              # AI_JOB_WORKERS concurrent jobs
+    python ai_worker.py --workers 4
+
+Use this where the API cannot keep workers alive between requests
+(serverless) and set AI_JOB_WORKERS=0 for the API itself.
+"""
+import argparse
+import asyncio
+from app.config import settings
+from app import jobs, groq_client
+# Registers the job handlers
+from app.routers import ai  # noqa: F401
+
+
+async def run(workers: int):
+    worker = jobs.Worker(workers, settings.AI_JOB_POLL_INTERVAL)
+    await worker.start()
+    print(f"Running background jobs with {workers} worker(s), Ctrl+C to stop")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+        await groq_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--workers", type=int, default=max(settings.AI_JOB_WORKERS, 1))
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Per-project task counters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_task_counters',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('todo_count', sa.Integer(), nullable=False),
+        sa.Column('in_progress_count', sa.Integer(), nullable=False),
+        sa.Column('done_count', sa.Integer(), nullable=False),
+        sa.Column('total_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+    # Fill the counters for existing projects; rebuild_counters.py does the same
+    op.execute(
+        """
+        INSERT INTO project_task_counters (project_id, todo_count, in_progress_count, done_count, total_count)
+        SELECT p.id,
+               COUNT(CASE WHEN t.status = 'TODO' THEN 1 END),
+               COUNT(CASE WHEN t.status = 'IN_PROGRESS' THEN 1 END),
+               COUNT(CASE WHEN t.status = 'DONE' THEN 1 END),
+               COUNT(t.id)
+        FROM projects p LEFT OUTER JOIN tasks t ON t.project_id = p.id
+        GROUP BY p.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('project_task_counters')
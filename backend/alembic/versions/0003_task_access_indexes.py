@@ -0,0 +1,64 @@
+"""Indexes for the task access patterns and a primary key on project_members
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_TASK_CONDITION = sa.text("status != 'DONE'")
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_project_id_status', 'tasks', ['project_id', 'status'])
+    op.create_index('ix_tasks_assignee_id_status', 'tasks', ['assignee_id', 'status'])
+    op.create_index(
+        'ix_tasks_open_deadline', 'tasks', ['deadline'],
+        postgresql_where=OPEN_TASK_CONDITION,
+        sqlite_where=OPEN_TASK_CONDITION
+    )
+
+    # The primary key needs unique, non-null rows: drop incomplete and duplicate memberships first
+    op.execute("DELETE FROM project_members WHERE project_id IS NULL OR user_id IS NULL")
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            """
+            DELETE FROM project_members a USING project_members b
+            WHERE a.ctid < b.ctid AND a.project_id = b.project_id AND a.user_id = b.user_id
+            """
+        )
+    else:
+        op.execute(
+            """
+            DELETE FROM project_members WHERE rowid NOT IN (
+                SELECT MIN(rowid) FROM project_members GROUP BY project_id, user_id
+            )
+            """
+        )
+    with op.batch_alter_table('project_members') as batch_op:
+        batch_op.alter_column('project_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key('project_members_pkey', ['project_id', 'user_id'])
+    op.create_index('ix_project_members_user_id', 'project_members', ['user_id', 'project_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_project_members_user_id', table_name='project_members')
+    with op.batch_alter_table('project_members') as batch_op:
+        batch_op.drop_constraint('project_members_pkey', type_='primary')
+        batch_op.alter_column('project_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+    op.drop_index('ix_tasks_open_deadline', table_name='tasks')
+    op.drop_index('ix_tasks_assignee_id_status', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_status', table_name='tasks')
@@ -0,0 +1,82 @@
+"""Full-text search documents and index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same statements as models.SEARCH_INDEX_DDL
+SEARCH_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE search_index USING fts5("
+        "title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_index(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_index(search_index, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+        "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_index(search_index, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+        "INSERT INTO search_index(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')) STORED",
+        "CREATE INDEX ix_search_documents_search_vector ON search_documents USING GIN (search_vector)",
+    ],
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        'search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('object_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.Column('title', sa.Text(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_search_documents_kind_object_id', 'search_documents', ['kind', 'object_id'], unique=True)
+    op.create_index('ix_search_documents_project_id', 'search_documents', ['project_id'], unique=False)
+    op.create_index('ix_search_documents_task_id', 'search_documents', ['task_id'], unique=False)
+    for statement in SEARCH_INDEX_DDL.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+    # Index existing rows; rebuild_search_index.py does the same
+    op.execute(
+        """
+        INSERT INTO search_documents (kind, object_id, project_id, task_id, title, body)
+        SELECT 'task', id, project_id, id, title, COALESCE(description, '') FROM tasks
+        UNION ALL
+        SELECT 'comment', c.id, t.project_id, c.task_id, '', c.content FROM comments c JOIN tasks t ON t.id = c.task_id
+        UNION ALL
+        SELECT 'project', id, id, NULL, name, COALESCE(description, '') FROM projects
+        UNION ALL
+        SELECT 'user_story', id, project_id, NULL, '', story FROM user_stories
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_index")
+    op.drop_index('ix_search_documents_task_id', table_name='search_documents')
+    op.drop_index('ix_search_documents_project_id', table_name='search_documents')
+    op.drop_index('ix_search_documents_kind_object_id', table_name='search_documents')
+    op.drop_table('search_documents')
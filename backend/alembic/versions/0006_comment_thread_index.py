@@ -0,0 +1,26 @@
+"""Index for a task's comments in order
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comments_task_id_created_at', 'comments', ['task_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_task_id_created_at', table_name='comments')
@@ -0,0 +1,114 @@
+"""
+Async request path (ASYNC_DB=true).
+
+The route handlers are written once against a sync `Session`. In async mode
+every sync handler is re-registered as a coroutine that runs it through
+`AsyncSession.run_sync`: the handler executes on the event loop with the sync
+facade of the request's AsyncSession, and each query is awaited on the
+asyncio driver (asyncpg or aiosqlite). Requests therefore no longer hold a
+threadpool slot while they wait on the database.
+
+The response model is validated inside `run_sync` as well, because lazy
+relationship loads triggered by serialization need the same context.
+"""
+import functools
+import inspect
+from typing import Any, Callable, Dict, TypeVar
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from . import auth
+from .database import get_db, get_async_db
+
+# Session.info key pointing from the sync facade back to its AsyncSession
+ASYNC_SESSION_KEY = "async_session"
+
+T = TypeVar("T")
+
+
+async def get_bridged_db(db: AsyncSession = Depends(get_async_db)):
+    """Stands in for get_db: the sync facade of the request's AsyncSession"""
+    db.sync_session.info[ASYNC_SESSION_KEY] = db
+    yield db.sync_session
+
+
+async def run_db(db: Session, fn: Callable[[Session], T]) -> T:
+    """Run fn(db) from an async endpoint without blocking the event loop.
+
+    In async mode db is the facade of an AsyncSession and fn goes through
+    run_sync; otherwise fn runs in the threadpool like a sync endpoint.
+    """
+    async_session = db.info.get(ASYNC_SESSION_KEY)
+    if async_session is not None:
+        return await async_session.run_sync(fn)
+    return await run_in_threadpool(fn, db)
+
+
+def dependency_overrides() -> Dict[Callable, Callable]:
+    return {
+        get_db: get_bridged_db,
+        auth.get_current_user: auth.get_current_user_async,
+        auth.get_current_principal: auth.get_current_principal_async,
+    }
+
+
+def _async_session(kwargs: Dict[str, Any]):
+    for value in kwargs.values():
+        if isinstance(value, Session) and ASYNC_SESSION_KEY in value.info:
+            return value.info[ASYNC_SESSION_KEY]
+    return None
+
+
+def _bridge(endpoint: Callable, response_model: Any) -> Callable:
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def run(*args, **kwargs):
+        result = endpoint(*args, **kwargs)
+        if adapter is None or result is None or isinstance(result, Response):
+            return result
+        return adapter.validate_python(result, from_attributes=True)
+
+    @functools.wraps(endpoint)
+    async def bridged_endpoint(*args, **kwargs):
+        db = _async_session(kwargs)
+        if db is None:
+            # No database access, nothing to wait on
+            return run(*args, **kwargs)
+        return await db.run_sync(lambda sync_session: run(*args, **kwargs))
+
+    return bridged_endpoint
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """A copy of router whose sync handlers run on the event loop"""
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        endpoint = route.endpoint
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _bridge(endpoint, route.response_model)
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+            openapi_extra=route.openapi_extra,
+        )
+    return async_router
@@ -1,28 +1,55 @@
+import hashlib
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from .cache import TTLCache
 from .config import settings
-from .database import get_db
-from . import models, schemas
+from .database import get_db, get_async_db
+from .jwt_backends import InvalidTokenError, get_backend
+from . import models, schemas, hashing
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+jwt_backend = get_backend(settings.JWT_BACKEND)
+
+# User ids of verified tokens, keyed by the token's SHA-256 and kept until
+# the token expires, so repeat requests skip signature verification
+token_cache = TTLCache("verified_token", maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as most endpoints need it: no ORM state, safe to cache"""
+    id: int
+    role: models.UserRole
+    username: str
+
+
+# Principals by user id (the JWT subject). Per process, so a role change or
+# deletion made through another worker takes up to the TTL to be seen here
+principal_cache = TTLCache("principal", maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_principal(user_id: int):
+    principal_cache.invalidate(user_id)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     # Truncate password to 72 bytes for bcrypt compatibility
     password_bytes = plain_password.encode('utf-8')[:72]
-    return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
+    return hashing.check_password(password_bytes, hashed_password.encode('utf-8'))
 
 
 def get_password_hash(password: str) -> str:
     # Truncate password to 72 bytes for bcrypt compatibility
     password_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
+    hashed = hashing.hash_password(password_bytes)
     return hashed.decode('utf-8')
 
 
@@ -33,33 +60,89 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt_backend.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_token_user_id(token: str) -> int:
+    """Validate a JWT and return the user id from its subject"""
+    token_key = hashlib.sha256(token.encode("utf-8")).digest()
+    user_id = token_cache.get(token_key)
+    if user_id is not None:
+        return user_id
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt_backend.decode(token, settings.SECRET_KEY, [settings.ALGORITHM])
         user_id_str: str = payload.get("sub")
         if user_id_str is None:
-            raise credentials_exception
+            raise credentials_exception()
         user_id = int(user_id_str)
-    except (JWTError, ValueError, TypeError):
-        raise credentials_exception
-    
+    except (InvalidTokenError, ValueError, TypeError):
+        raise credentials_exception()
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.set(token_key, user_id, ttl=expires_at - time.time())
+    return user_id
+
+
+def _principal_query(user_id: int):
+    return select(models.User.id, models.User.role, models.User.username).where(models.User.id == user_id)
+
+
+def _cache_principal(row) -> Principal:
+    if row is None:
+        raise credentials_exception()
+    principal = Principal(id=row.id, role=row.role, username=row.username)
+    principal_cache.set(principal.id, principal)
+    return principal
+
+
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """The authenticated user's id, role and username, from the cache when possible"""
+    user_id = get_token_user_id(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal(db.execute(_principal_query(user_id)).first())
+    return principal
+
+
+async def get_current_principal_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """get_current_principal for ASYNC_DB mode"""
+    user_id = get_token_user_id(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal((await db.execute(_principal_query(user_id))).first())
+    return principal
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+    """The authenticated user as an ORM object, for endpoints that need more than the principal"""
+    user_id = get_token_user_id(token)
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
+    return user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> models.User:
+    """get_current_user for ASYNC_DB mode, loads the user through the request's AsyncSession"""
+    user_id = get_token_user_id(token)
+    user = await db.get(models.User, user_id)
+    if user is None:
+        raise credentials_exception()
     return user
 
 
 def require_role(allowed_roles: list):
-    def role_checker(current_user: models.User = Depends(get_current_user)):
+    # async so the check runs on the event loop instead of taking a threadpool slot
+    async def role_checker(current_user: Principal = Depends(get_current_principal)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -7,7 +7,67 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # JWT library: "jose" (python-jose) or "pyjwt" (PyJWT, installed separately)
+    JWT_BACKEND: Literal["jose", "pyjwt"] = "jose"
+    # Verified tokens remembered per process until they expire
+    TOKEN_CACHE_SIZE: int = 10000
     GROQ_API_KEY: Optional[str] = None
+    GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    # Unset for the Groq API, or e.g. the fake server used by tests and benchmarks
+    GROQ_BASE_URL: Optional[str] = None
+    GROQ_TIMEOUT: float = 60.0
+    GROQ_CONNECT_TIMEOUT: float = 5.0
+    # Retried with exponential backoff on connection errors, 429 and 5xx
+    GROQ_MAX_RETRIES: int = 2
+    GROQ_MAX_CONNECTIONS: int = 20
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    GROQ_KEEPALIVE_EXPIRY: float = 60.0
+    # Generated stories cached in memory and, when STORY_CACHE_PATH is set,
+    # in a local SQLite file that survives restarts
+    STORY_CACHE_SIZE: int = 1000
+    STORY_CACHE_TTL: int = 86400
+    STORY_CACHE_PATH: Optional[str] = None
+
+    # Background jobs (generate-and-save): concurrent jobs per process, 0 to
+    # leave them to a separate `python ai_worker.py`; how often idle workers
+    # look for jobs queued by other processes; when a running job counts as
+    # abandoned (idle workers check every tenth of it); how often it is retried
+    AI_JOB_WORKERS: int = 2
+    AI_JOB_POLL_INTERVAL: float = 5.0
+    AI_JOB_STALE_AFTER: int = 600
+    AI_JOB_MAX_ATTEMPTS: int = 3
+
+    # Connection pooling: "null" opens a connection per request (serverless),
+    # "queue" keeps a pool for long-running servers, "external" leaves pooling
+    # to an external pooler such as PgBouncer. In sync mode a request keeps
+    # its connection while it waits for threadpool workers, so size
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW for peak concurrent requests, otherwise
+    # bursts fail with pool timeouts
+    DB_POOL_MODE: Literal["null", "queue", "external"] = "null"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Serve the routers on the event loop with an AsyncSession (asyncpg for
+    # PostgreSQL, aiosqlite for SQLite) instead of sync sessions in the threadpool
+    ASYNC_DB: bool = False
+
+    # Authenticated principals (id, role, username) cached per process
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+
+    # Project ids each user is a team member of, cached per process; 0 checks
+    # membership with a query on every request
+    MEMBERSHIP_CACHE_SIZE: int = 10000
+    MEMBERSHIP_CACHE_TTL: int = 60
+
+    # bcrypt runs on its own executor: at most PASSWORD_HASH_WORKERS hashes at
+    # once, PASSWORD_HASH_QUEUE_LIMIT waiting, further requests get a 503
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
 
     class Config:
         env_file = ".env"
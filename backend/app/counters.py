@@ -0,0 +1,134 @@
+"""
+Incrementally maintained per-project task counters.
+
+The routers call these helpers in the same transaction as the task write, so
+the counters commit or roll back together with the tasks they describe.
+`rebuild` recomputes every row from the tasks table and reports drift.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, update, func, case
+from sqlalchemy.orm import Session
+from . import models
+
+# Counter column for each task status
+STATUS_COLUMNS = {
+    models.TaskStatus.TODO: "todo_count",
+    models.TaskStatus.IN_PROGRESS: "in_progress_count",
+    models.TaskStatus.DONE: "done_count",
+}
+
+COUNT_COLUMNS = list(STATUS_COLUMNS.values()) + ["total_count"]
+
+
+def task_added(db: Session, project_id: int, task_status: models.TaskStatus):
+    apply_deltas(db, project_id, {STATUS_COLUMNS[models.TaskStatus(task_status)]: 1, "total_count": 1})
+
+
+def tasks_added(db: Session, tasks: Iterable[Tuple[int, models.TaskStatus]]):
+    """Count many new (project_id, status) tasks with one update per project"""
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for project_id, task_status in tasks:
+        deltas[project_id][STATUS_COLUMNS[models.TaskStatus(task_status)]] += 1
+        deltas[project_id]["total_count"] += 1
+    for project_id, project_deltas in deltas.items():
+        apply_deltas(db, project_id, project_deltas)
+
+
+def tasks_status_changed(db: Session, changes: Iterable[Tuple[int, models.TaskStatus, models.TaskStatus]]):
+    """Count many (project_id, old_status, new_status) changes with one update per project"""
+    task_groups_status_changed(db, ((project_id, old, new, 1) for project_id, old, new in changes))
+
+
+def task_groups_status_changed(db: Session, groups: Iterable[Tuple[int, models.TaskStatus, models.TaskStatus, int]]):
+    """tasks_status_changed for (project_id, old_status, new_status, task count) groups"""
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for project_id, old_status, new_status, count in groups:
+        deltas[project_id][STATUS_COLUMNS[models.TaskStatus(old_status)]] -= count
+        deltas[project_id][STATUS_COLUMNS[models.TaskStatus(new_status)]] += count
+    for project_id, project_deltas in deltas.items():
+        project_deltas = {column: delta for column, delta in project_deltas.items() if delta}
+        if project_deltas:
+            apply_deltas(db, project_id, project_deltas)
+
+
+def task_removed(db: Session, project_id: int, task_status: models.TaskStatus):
+    apply_deltas(db, project_id, {STATUS_COLUMNS[models.TaskStatus(task_status)]: -1, "total_count": -1})
+
+
+def task_status_changed(db: Session, project_id: int, old_status: models.TaskStatus, new_status: models.TaskStatus):
+    old_column = STATUS_COLUMNS[models.TaskStatus(old_status)]
+    new_column = STATUS_COLUMNS[models.TaskStatus(new_status)]
+    if old_column != new_column:
+        apply_deltas(db, project_id, {old_column: -1, new_column: 1})
+
+
+def apply_deltas(db: Session, project_id: int, deltas: Dict[str, int]):
+    """Atomically add deltas to a project's counter row.
+
+    Projects created before the counter table existed have no row yet; for
+    those the row is recomputed from the tasks instead. Pending changes are
+    flushed first so both paths see the write being counted.
+    """
+    db.flush()
+    counter = models.ProjectTaskCounter.__table__.c
+    result = db.execute(
+        update(models.ProjectTaskCounter)
+        .where(models.ProjectTaskCounter.project_id == project_id)
+        .values({column: counter[column] + delta for column, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        actual = _actual_counts(db, [project_id]).get(project_id, dict.fromkeys(COUNT_COLUMNS, 0))
+        db.add(models.ProjectTaskCounter(project_id=project_id, **actual))
+
+
+def _actual_counts(db: Session, project_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+    """Counts recomputed from the tasks table, for every project or the given ones"""
+    stmt = select(
+        models.Project.id,
+        *[func.count(case((models.Task.status == task_status, 1))).label(column) for task_status, column in STATUS_COLUMNS.items()],
+        func.count(models.Task.id).label("total_count")
+    ).outerjoin(
+        models.Task, models.Task.project_id == models.Project.id
+    ).group_by(models.Project.id)
+    if project_ids is not None:
+        stmt = stmt.where(models.Project.id.in_(project_ids))
+    return {
+        row.id: {column: row._mapping[column] for column in COUNT_COLUMNS}
+        for row in db.execute(stmt)
+    }
+
+
+def rebuild(db: Session, verify_only: bool = False) -> List[dict]:
+    """Recompute every counter row from the tasks table.
+
+    Returns one entry per drifted value. Unless verify_only is set, drifted
+    and missing rows are corrected and orphaned rows removed; the caller
+    commits.
+    """
+    actual = _actual_counts(db)
+    stored = {counter.project_id: counter for counter in db.query(models.ProjectTaskCounter).all()}
+
+    drift = []
+    for project_id, counts in actual.items():
+        counter = stored.pop(project_id, None)
+        for column, value in counts.items():
+            stored_value = getattr(counter, column) if counter is not None else None
+            if stored_value != value:
+                drift.append({"project_id": project_id, "field": column, "stored": stored_value, "actual": value})
+        if verify_only:
+            continue
+        if counter is None:
+            db.add(models.ProjectTaskCounter(project_id=project_id, **counts))
+        else:
+            for column, value in counts.items():
+                setattr(counter, column, value)
+
+    # Rows left over belong to projects that no longer exist
+    for project_id, counter in stored.items():
+        drift.append({"project_id": project_id, "field": "project", "stored": counter.total_count, "actual": None})
+        if not verify_only:
+            db.delete(counter)
+
+    return drift
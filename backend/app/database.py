@@ -1,21 +1,114 @@
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from .config import settings
+from . import metrics
 
-# Configure engine for serverless deployment (Vercel)
-# NullPool prevents connection pooling issues in serverless environments
-connect_args = {}
-if "postgresql" in settings.DATABASE_URL:
-    connect_args = {"sslmode": "require"}
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=NullPool,  # Important for serverless
-    connect_args=connect_args
-)
+pool_connects = metrics.counter("db_pool_connects_total", "New database connections opened")
+pool_checkouts = metrics.counter("db_pool_checkouts_total", "Connections handed out by the pool")
+pool_timeouts = metrics.counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection")
+pool_wait = metrics.histogram("db_pool_wait_ms", "Time spent waiting for a pooled connection")
+
+
+class TimedCheckoutMixin:
+    """Records how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait.observe((time.perf_counter() - start) * 1000)
+
+
+class TimedQueuePool(TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(pool_mode: str, is_async: bool = False) -> dict:
+    """Engine keyword arguments for a DB_POOL_MODE"""
+    if pool_mode == "queue":
+        # Long-running server: reuse connections, drop ones the server closed
+        return {
+            "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+    # "null" for serverless deployments (Vercel) where a process may be frozen
+    # between requests, "external" when PgBouncer or similar already pools
+    # connections: either way the app must not hold connections itself
+    return {"poolclass": NullPool}
+
+
+def create_db_engine(database_url: str, pool_mode: str):
+    connect_args = {}
+    if "postgresql" in database_url:
+        connect_args = {"sslmode": "require"}
+
+    db_engine = create_engine(database_url, connect_args=connect_args, **pool_options(pool_mode))
+    event.listen(db_engine, "connect", lambda dbapi_connection, connection_record: pool_connects.inc())
+    event.listen(db_engine, "checkout", lambda dbapi_connection, connection_record, connection_proxy: pool_checkouts.inc())
+    return db_engine
+
+
+def register_pool_gauge(pool, label: str):
+    """Report the checked-out connections of one of the application's engines as db_pool_checked_out_<label>"""
+    if isinstance(pool, QueuePool):
+        metrics.gauge(f"db_pool_checked_out_{label}", f"Connections currently checked out ({label} engine)", pool.checkedout)
+
+
+def async_database_url(database_url: str) -> str:
+    """The DATABASE_URL with the asyncio driver for its backend"""
+    url = make_url(database_url)
+    drivers = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    # asyncpg does not understand sslmode; SSL is requested through connect_args
+    url = url.difference_update_query(["sslmode"])
+    return url.set(drivername=drivers.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: str, pool_mode: str):
+    connect_args = {}
+    if "postgresql" in database_url:
+        connect_args = {"ssl": "require"}
+        if pool_mode == "external":
+            # PgBouncer in transaction mode cannot keep prepared statements
+            connect_args["statement_cache_size"] = 0
+
+    db_engine = create_async_engine(
+        async_database_url(database_url),
+        connect_args=connect_args,
+        **pool_options(pool_mode, is_async=True)
+    )
+    event.listen(db_engine.sync_engine, "connect", lambda dbapi_connection, connection_record: pool_connects.inc())
+    event.listen(db_engine.sync_engine, "checkout", lambda dbapi_connection, connection_record, connection_proxy: pool_checkouts.inc())
+    return db_engine
+
+
+engine = create_db_engine(settings.DATABASE_URL, settings.DB_POOL_MODE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+register_pool_gauge(engine.pool, "sync")
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB:
+    async_engine = create_async_db_engine(settings.DATABASE_URL, settings.DB_POOL_MODE)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=True)
+    register_pool_gauge(async_engine.sync_engine.pool, "async")
 
 Base = declarative_base()
 
@@ -26,3 +119,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
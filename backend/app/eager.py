@@ -0,0 +1,63 @@
+"""
+Eager loading planned from response schemas.
+
+Nested fields of a response schema (TaskResponse.assignee,
+ProjectResponse.team_members, CommentResponse.author) are relationships
+that Pydantic reads while validating each returned object. Left to lazy
+loading that is one query per object and relationship. `load_options`
+walks a schema against the model's relationships, level by level, and
+returns the loader options that fetch every nested field with the query
+itself: a join for to-one relationships, one SELECT ... IN per collection.
+Routers that return ORM objects build their query through `load` with the
+endpoint's response_model, so a nested field added to a schema is loaded
+up front without touching the endpoints.
+
+List endpoints built from column rows (serialization.RowPlan) do not need
+this; tests/test_query_counts.py checks every list endpoint either way.
+"""
+import typing
+from functools import lru_cache
+from typing import Optional, Type
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def item_schema(annotation) -> Optional[Type[BaseModel]]:
+    """The schema of a field or response_model: X, Optional[X], List[X] or Optional[List[X]]"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union or origin in (list, set, tuple):
+        for argument in typing.get_args(annotation):
+            schema = item_schema(argument)
+            if schema is not None:
+                return schema
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_options(schema: Type[BaseModel], model) -> tuple:
+    """Loader options for every relationship the schema nests, recursively"""
+    mapper = inspect(model)
+    options = []
+    for name, field in schema.model_fields.items():
+        nested = item_schema(field.annotation)
+        if nested is None or name not in mapper.relationships:
+            continue
+        relationship = mapper.relationships[name]
+        attribute = getattr(model, name)
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        nested_options = load_options(nested, relationship.mapper.class_)
+        options.append(loader.options(*nested_options) if nested_options else loader)
+    return tuple(options)
+
+
+def load(query, response_model):
+    """Add to a query over a model the eager loads its response_model needs"""
+    schema = item_schema(response_model)
+    if schema is None:
+        return query
+    model = query.column_descriptions[0]["entity"]
+    return query.options(*load_options(schema, model))
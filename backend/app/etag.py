@@ -0,0 +1,65 @@
+"""
+Weak ETags for conditional GETs.
+
+List and detail endpoints describe the rows behind a response with a cheap
+version fingerprint. For lists it is aggregated over only the rows of the
+requested page (page_version), so a 304 costs as much as the page query
+and not a scan of the whole filtered set. The tag hashes the fingerprint
+together with the request's query string and the caller, so a matching
+`If-None-Match` is answered with 304 before any rows are loaded or
+serialized.
+
+Sums of ids change when rows enter or leave a page; maxima of updated_at,
+set from the application clock (models.utcnow), change when a row is
+written. Changes that do not touch a row's own columns, such as a
+project's team, bump it explicitly. Embedded rows (assignees, team
+members, comment counts) are covered by correlated per-row expressions
+passed in by the router. The dashboard endpoints are already a single
+aggregate query with nothing to materialize, so their tag is computed
+from the figures.
+"""
+import hashlib
+from typing import Any, Optional, Sequence
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from .auth import Principal
+
+
+def page_version(db: Session, page, sums: Sequence = (), maxes: Sequence = ()) -> tuple:
+    """Row count, the sum of each of sums and the max of each of maxes over the rows of a limited query"""
+    rows = page.with_entities(
+        *[column.label(f"sum_{i}") for i, column in enumerate(sums)],
+        *[column.label(f"max_{i}") for i, column in enumerate(maxes)]
+    ).subquery()
+    return tuple(db.execute(select(
+        func.count(),
+        *[func.sum(rows.c[f"sum_{i}"]) for i in range(len(sums))],
+        *[func.max(rows.c[f"max_{i}"]) for i in range(len(maxes))]
+    ).select_from(rows)).one())
+
+
+def make_tag(request: Request, current_user: Principal, fingerprint: Any) -> str:
+    raw = repr((request.url.path, request.url.query, current_user.id, current_user.role, fingerprint))
+    return 'W/"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Weak comparison of an If-None-Match header against tag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = tag.removeprefix("W/")
+    return any(value.strip().removeprefix("W/") == opaque for value in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, current_user: Principal, fingerprint: Any) -> Optional[Response]:
+    """Tag the response; return a 304 to send instead when the client already has this version"""
+    tag = make_tag(request, current_user, fingerprint)
+    # Responses are per user; let browsers keep them but always revalidate
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,46 @@
+"""
+App-lifetime AsyncGroq client.
+
+One client is shared by every request so its httpx pool keeps connections
+(and their TLS sessions) alive between completions. Timeouts and the retry
+count come from settings; the SDK retries connection errors, 408, 409, 429
+and 5xx responses with exponential backoff and jitter. The client is
+created on first use and closed by the application lifespan.
+"""
+from typing import Optional
+import httpx
+from groq import AsyncGroq
+from .config import settings
+
+_client: Optional[AsyncGroq] = None
+
+
+def create_client() -> AsyncGroq:
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.GROQ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT),
+    )
+    return AsyncGroq(
+        api_key=settings.GROQ_API_KEY,
+        base_url=settings.GROQ_BASE_URL,
+        max_retries=settings.GROQ_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+
+def get_client() -> AsyncGroq:
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
+
+
+async def close():
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.close()
@@ -0,0 +1,101 @@
+"""
+Bounded executor for bcrypt.
+
+bcrypt is deliberately slow, so hashing runs on its own small pool of
+threads (or processes, PASSWORD_HASH_EXECUTOR=process) instead of the request
+threadpool. At most PASSWORD_HASH_WORKERS hashes run at once and at most
+PASSWORD_HASH_QUEUE_LIMIT more wait; beyond that requests fail fast with 503
+rather than tying up request threads, so a login storm cannot starve the
+rest of the API.
+
+Callers block until their hash is done. In ASYNC_DB mode sync handlers run
+in a greenlet on the event loop; there the wait is awaited instead so the
+loop keeps serving other requests.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+import bcrypt
+from fastapi import HTTPException, status
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from .config import settings
+from . import metrics
+
+hash_latency = metrics.histogram("password_hash_ms", "Time to hash a password, including queueing")
+verify_latency = metrics.histogram("password_verify_ms", "Time to verify a password, including queueing")
+rejected = metrics.counter("password_hash_rejected_total", "Password operations refused because the queue was full")
+
+_executor: Optional[Executor] = None
+_lock = threading.Lock()
+_in_flight = 0
+
+metrics.gauge("password_hash_in_flight", "Password operations running or queued", lambda: _in_flight)
+
+
+def _hash(password_bytes: bytes) -> bytes:
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt())
+
+
+def _check(password_bytes: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password_bytes, hashed)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+    return _executor
+
+
+def _release(future: Future):
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def _submit(fn, *args) -> Future:
+    global _in_flight
+    with _lock:
+        if _in_flight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT:
+            rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        _in_flight += 1
+        try:
+            future = _get_executor().submit(fn, *args)
+        except Exception:
+            _in_flight -= 1
+            raise
+    future.add_done_callback(_release)
+    return future
+
+
+def _run(histogram: metrics.Histogram, fn, *args):
+    future = _submit(fn, *args)
+    start = time.perf_counter()
+    try:
+        if in_greenlet():
+            return await_only(asyncio.wrap_future(future))
+        return future.result()
+    finally:
+        histogram.observe((time.perf_counter() - start) * 1000)
+
+
+def hash_password(password_bytes: bytes) -> bytes:
+    return _run(hash_latency, _hash, password_bytes)
+
+
+def check_password(password_bytes: bytes, hashed: bytes) -> bool:
+    return _run(verify_latency, _check, password_bytes, hashed)
+
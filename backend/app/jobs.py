@@ -0,0 +1,218 @@
+"""
+Database-backed background jobs.
+
+Jobs are rows in the jobs table, so they survive restarts and can be run by
+any process. A worker claims the oldest queued job with a conditional UPDATE
+(only one claimant can move it from queued to running), runs the handler
+registered for its kind and records the result or the error.
+
+A handler is a coroutine taking the job. It does its slow work without a
+database session and returns a function that writes its results; that
+function runs in the same transaction that marks the job succeeded, so a
+job's effects are committed exactly once.
+
+`Worker` runs AI_JOB_WORKERS such loops on the event loop. The application
+lifespan starts one for local and long-running deployments; on serverless
+hosts set AI_JOB_WORKERS=0 and run ai_worker.py separately.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from .config import settings
+from .database import SessionLocal
+from . import models, metrics
+
+logger = logging.getLogger(__name__)
+
+Finish = Callable[[Session], Optional[dict]]
+Handler = Callable[[models.Job], Awaitable[Finish]]
+
+_handlers: Dict[str, Handler] = {}
+
+jobs_succeeded = metrics.counter("jobs_succeeded_total", "Background jobs completed")
+jobs_failed = metrics.counter("jobs_failed_total", "Background jobs that failed")
+job_duration = metrics.histogram("job_duration_ms", "Time from claiming a job to recording its outcome")
+
+
+def handler(kind: str):
+    """Register the coroutine that runs jobs of a kind"""
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def enqueue(db: Session, kind: str, payload: dict, project_id: Optional[int] = None, creator_id: Optional[int] = None) -> models.Job:
+    """Add a queued job; the caller commits and then calls notify"""
+    job = models.Job(
+        kind=kind,
+        status=models.JobStatus.QUEUED,
+        payload=payload,
+        attempts=0,
+        project_id=project_id,
+        creator_id=creator_id
+    )
+    db.add(job)
+    return job
+
+
+def claim_next(db: Session) -> Optional[models.Job]:
+    """Move the oldest queued job to running and return it detached, None when the queue is empty"""
+    job_model = models.Job
+    while True:
+        job_id = db.execute(
+            select(job_model.id).where(job_model.status == models.JobStatus.QUEUED).order_by(job_model.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        claimed = db.execute(
+            update(job_model)
+            .where(job_model.id == job_id, job_model.status == models.JobStatus.QUEUED)
+            .values(status=models.JobStatus.RUNNING, started_at=datetime.now(timezone.utc), attempts=job_model.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            job = db.get(job_model, job_id)
+            db.expunge(job)
+            return job
+
+
+def complete(db: Session, job_id: int, finish: Finish):
+    job = db.get(models.Job, job_id)
+    if job is None:
+        # Deleted with its project while running
+        return
+    job.result = finish(db)
+    job.status = models.JobStatus.SUCCEEDED
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def fail(db: Session, job_id: int, error: str):
+    db.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id)
+        .values(status=models.JobStatus.FAILED, error=error, finished_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def requeue(db: Session, job_ids: List[int]):
+    """Put running jobs back in the queue, failing those out of attempts"""
+    job_model = models.Job
+    for job_id in job_ids:
+        job = db.get(job_model, job_id)
+        if job is None or job.status != models.JobStatus.RUNNING:
+            continue
+        if job.attempts >= settings.AI_JOB_MAX_ATTEMPTS:
+            job.status = models.JobStatus.FAILED
+            job.error = "Gave up after the worker stopped while running the job"
+            job.finished_at = datetime.now(timezone.utc)
+        else:
+            job.status = models.JobStatus.QUEUED
+    db.commit()
+
+
+def requeue_stale(db: Session) -> int:
+    """Requeue jobs left running longer than AI_JOB_STALE_AFTER, e.g. by a crashed worker"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.AI_JOB_STALE_AFTER)
+    stale = db.execute(
+        select(models.Job.id).where(models.Job.status == models.JobStatus.RUNNING, models.Job.started_at < cutoff)
+    ).scalars().all()
+    requeue(db, stale)
+    return len(stale)
+
+
+def _in_session(fn, *args):
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+class Worker:
+    """A bounded pool of job loops on the running event loop"""
+
+    def __init__(self, concurrency: int, poll_interval: float, stale_check_interval: Optional[float] = None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        # Abandoned jobs are requeued within about 1.1 x AI_JOB_STALE_AFTER
+        self.stale_check_interval = (
+            stale_check_interval if stale_check_interval is not None
+            else max(poll_interval, settings.AI_JOB_STALE_AFTER / 10)
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._next_stale_check = 0.0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        await self._requeue_stale_if_due()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def notify(self):
+        """Wake an idle loop; safe to call from any thread"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _requeue_stale_if_due(self) -> int:
+        """requeue_stale at most once per stale_check_interval across this worker's loops"""
+        now = self._loop.time()
+        if now < self._next_stale_check:
+            return 0
+        self._next_stale_check = now + self.stale_check_interval
+        return await run_in_threadpool(_in_session, requeue_stale)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            job = await run_in_threadpool(_in_session, claim_next)
+            if job is None:
+                if await self._requeue_stale_if_due():
+                    continue
+                try:
+                    # Jobs enqueued by other processes are found by polling
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await run_job(job)
+            except asyncio.CancelledError:
+                # Shutting down mid-job: hand it back for the next worker
+                _in_session(requeue, [job.id])
+                raise
+
+
+async def run_job(job: models.Job):
+    started = asyncio.get_running_loop().time()
+    try:
+        finish = await _handlers[job.kind](job)
+        await run_in_threadpool(_in_session, complete, job.id, finish)
+        jobs_succeeded.inc()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.exception("Job %s (%s) failed: %s", job.id, job.kind, error)
+        await run_in_threadpool(_in_session, fail, job.id, error)
+        jobs_failed.inc()
+    finally:
+        job_duration.observe((asyncio.get_running_loop().time() - started) * 1000)
+
+
+worker = Worker(settings.AI_JOB_WORKERS, settings.AI_JOB_POLL_INTERVAL)
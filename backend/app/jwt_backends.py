@@ -0,0 +1,56 @@
+"""
+Interchangeable JWT libraries.
+
+python-jose is the default. JWT_BACKEND=pyjwt switches to PyJWT, which
+verifies HS256 tokens with less per-call overhead; install it separately
+(`pip install PyJWT`). Both produce and accept the same tokens, so the
+backend can be changed without logging anyone out.
+"""
+from typing import Callable, NamedTuple
+
+
+class InvalidTokenError(Exception):
+    """The token is malformed, expired or its signature does not verify"""
+
+
+class JWTBackend(NamedTuple):
+    name: str
+    encode: Callable[[dict, str, str], str]
+    decode: Callable[[str, str, list], dict]
+
+
+def _jose_backend() -> JWTBackend:
+    from jose import JWTError, jwt
+
+    def decode(token: str, key: str, algorithms: list) -> dict:
+        try:
+            return jwt.decode(token, key, algorithms=algorithms)
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+    return JWTBackend("jose", lambda claims, key, algorithm: jwt.encode(claims, key, algorithm=algorithm), decode)
+
+
+def _pyjwt_backend() -> JWTBackend:
+    try:
+        import jwt
+    except ImportError:
+        raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package (pip install PyJWT)")
+
+    def decode(token: str, key: str, algorithms: list) -> dict:
+        try:
+            return jwt.decode(token, key, algorithms=algorithms)
+        except jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+    return JWTBackend("pyjwt", lambda claims, key, algorithm: jwt.encode(claims, key, algorithm=algorithm), decode)
+
+
+BACKENDS = {
+    "jose": _jose_backend,
+    "pyjwt": _pyjwt_backend,
+}
+
+
+def get_backend(name: str) -> JWTBackend:
+    return BACKENDS[name]()
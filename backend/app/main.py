@@ -1,16 +1,33 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .database import engine, Base
-from .routers import auth, users, projects, tasks, ai, dashboard
+from .routers import auth, users, projects, tasks, ai, dashboard, search
+from . import metrics, async_routes, groq_client, jobs, serialization, models
+from .auth import require_role
+from .config import settings
 
 # Note: Database tables should be created using Alembic migrations
 # Not automatically on startup in serverless environments
 # Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.AI_JOB_WORKERS > 0:
+        await jobs.worker.start()
+    yield
+    await jobs.worker.stop()
+    # The shared AI client is opened on first use, close its connections on shutdown
+    await groq_client.close()
+
+
 app = FastAPI(
     title="Project Management Tool API",
     description="A comprehensive project management system with AI-powered user story generation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=serialization.JSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -24,15 +41,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Next-page links of paginated lists
+    expose_headers=["Link"],
 )
 
 # Include routers
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(projects.router)
-app.include_router(tasks.router)
-app.include_router(ai.router)
-app.include_router(dashboard.router)
+for router in [auth.router, users.router, projects.router, tasks.router, ai.router, dashboard.router, search.router]:
+    if settings.ASYNC_DB:
+        router = async_routes.asyncify_router(router)
+    app.include_router(router)
+
+if settings.ASYNC_DB:
+    app.dependency_overrides.update(async_routes.dependency_overrides())
 
 
 @app.get("/")
@@ -47,3 +67,9 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", dependencies=[Depends(require_role([models.UserRole.ADMIN]))])
+def get_metrics():
+    """Process-local counters and latency histograms (Admin only)"""
+    return metrics.snapshot()
@@ -0,0 +1,54 @@
+"""
+Project membership checks.
+
+Answers "is this user on this project's team" without loading the team. The
+set of project ids a user belongs to is read with one index-only scan of
+ix_project_members_user_id and cached per user; the routers invalidate it
+whenever they rewrite a project's team. With MEMBERSHIP_CACHE_TTL=0 every
+check is an EXISTS probe of the project_members primary key instead, which
+never serves a stale answer from another worker's write.
+"""
+from typing import FrozenSet, Iterable
+from sqlalchemy import select, exists
+from sqlalchemy.orm import Session
+from .cache import TTLCache
+from .config import settings
+from . import models
+
+visible_projects_cache = TTLCache(
+    "visible_projects",
+    maxsize=settings.MEMBERSHIP_CACHE_SIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL
+)
+
+
+def member_project_ids(user_id: int):
+    """Subquery of the project ids a user is a team member of"""
+    return select(models.project_members.c.project_id).where(
+        models.project_members.c.user_id == user_id
+    )
+
+
+def visible_project_ids(db: Session, user_id: int) -> FrozenSet[int]:
+    """Ids of the projects a user is a team member of"""
+    project_ids = visible_projects_cache.get(user_id)
+    if project_ids is None:
+        project_ids = frozenset(db.execute(member_project_ids(user_id)).scalars())
+        if settings.MEMBERSHIP_CACHE_TTL > 0:
+            visible_projects_cache.set(user_id, project_ids)
+    return project_ids
+
+
+def is_member(db: Session, user_id: int, project_id: int) -> bool:
+    if settings.MEMBERSHIP_CACHE_TTL <= 0:
+        members = models.project_members.c
+        return db.execute(
+            select(exists().where(members.project_id == project_id, members.user_id == user_id))
+        ).scalar()
+    return project_id in visible_project_ids(db, user_id)
+
+
+def invalidate(user_ids: Iterable[int]):
+    """Forget the cached projects of users whose membership changed"""
+    for user_id in user_ids:
+        visible_projects_cache.invalidate(user_id)
@@ -0,0 +1,100 @@
+"""
+In-process metrics: counters, latency histograms and gauges.
+
+Metrics are registered by name at import time of the module that owns them
+and exposed together by the /metrics endpoint, which only Admins may read.
+Values are per process.
+"""
+import bisect
+import threading
+from typing import Callable, Dict, List
+
+# Upper bounds (milliseconds) of the default latency buckets
+DEFAULT_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Counter:
+    def __init__(self, description: str):
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self):
+        return self._value
+
+
+class Histogram:
+    def __init__(self, description: str, buckets=DEFAULT_BUCKETS):
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(list(self.buckets) + ["+Inf"], self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {"count": self._count, "sum": round(self._sum, 3), "buckets": buckets}
+
+
+class Gauge:
+    """A value read on demand from a callback"""
+    def __init__(self, description: str, read: Callable[[], float]):
+        self.description = description
+        self._read = read
+
+    def snapshot(self):
+        return self._read()
+
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(name: str, factory):
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = factory()
+        return _registry[name]
+
+
+def counter(name: str, description: str) -> Counter:
+    return _register(name, lambda: Counter(description))
+
+
+def histogram(name: str, description: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(name, lambda: Histogram(description, buckets))
+
+
+def gauge(name: str, description: str, read: Callable[[], float]) -> Gauge:
+    with _registry_lock:
+        _registry[name] = Gauge(description, read)
+        return _registry[name]
+
+
+def snapshot() -> dict:
+    with _registry_lock:
+        metrics = dict(_registry)
+    return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
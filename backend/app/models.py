@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Table
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Table, Index, JSON, text, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
+from datetime import datetime, timezone
 import enum
 
 
+def utcnow() -> datetime:
+    # updated_at comes from the application clock: func.now() has only second
+    # resolution on SQLite, too coarse for the ETag fingerprints in etag.py
+    return datetime.now(timezone.utc)
+
+
 class UserRole(str, enum.Enum):
     ADMIN = "Admin"
     MANAGER = "Manager"
@@ -17,14 +24,26 @@ class TaskStatus(str, enum.Enum):
     DONE = "Done"
 
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 # Association table for project team members
 project_members = Table(
     'project_members',
     Base.metadata,
-    Column('project_id', Integer, ForeignKey('projects.id', ondelete='CASCADE')),
-    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'))
+    Column('project_id', Integer, ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves lookups by project, this one "projects of a user"
+    Index('ix_project_members_user_id', 'user_id', 'project_id')
 )
 
+# Tasks that can become overdue; TaskStatus is stored by member name
+OPEN_TASK_CONDITION = text("status != 'DONE'")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -36,7 +55,7 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.DEVELOPER)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     created_projects = relationship("Project", back_populates="creator", foreign_keys="Project.creator_id")
@@ -58,17 +77,42 @@ class Project(Base):
     end_date = Column(String)
     creator_id = Column(Integer, ForeignKey("users.id", ondelete='SET NULL'))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     creator = relationship("User", back_populates="created_projects", foreign_keys=[creator_id])
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
     team_members = relationship("User", secondary=project_members, back_populates="projects")
     user_stories = relationship("UserStory", back_populates="project", cascade="all, delete-orphan")
+    task_counter = relationship("ProjectTaskCounter", back_populates="project", uselist=False, cascade="all, delete-orphan")
+
+
+class ProjectTaskCounter(Base):
+    """Per-project task counts, maintained in the same transaction as task writes"""
+    __tablename__ = "project_task_counters"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete='CASCADE'), primary_key=True)
+    todo_count = Column(Integer, nullable=False, default=0)
+    in_progress_count = Column(Integer, nullable=False, default=0)
+    done_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=utcnow)
+
+    # Relationships
+    project = relationship("Project", back_populates="task_counter")
 
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_project_id_status", "project_id", "status"),
+        Index("ix_tasks_assignee_id_status", "assignee_id", "status"),
+        Index(
+            "ix_tasks_open_deadline", "deadline",
+            postgresql_where=OPEN_TASK_CONDITION,
+            sqlite_where=OPEN_TASK_CONDITION
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
@@ -80,7 +124,7 @@ class Task(Base):
     assignee_id = Column(Integer, ForeignKey("users.id", ondelete='SET NULL'))
     creator_id = Column(Integer, ForeignKey("users.id", ondelete='SET NULL'))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     project = relationship("Project", back_populates="tasks")
@@ -91,13 +135,17 @@ class Task(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    # A task's thread in order, and its comment count, from the index alone
+    __table_args__ = (
+        Index("ix_comments_task_id_created_at", "task_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
     task_id = Column(Integer, ForeignKey("tasks.id", ondelete='CASCADE'), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id", ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utcnow)
 
     # Relationships
     task = relationship("Task", back_populates="comments")
@@ -116,3 +164,72 @@ class UserStory(Base):
     # Relationships
     project = relationship("Project", back_populates="user_stories")
     creator = relationship("User", back_populates="user_stories")
+
+
+class Job(Base):
+    """A unit of background work, claimed and run by the workers in jobs.py"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete='CASCADE'))
+    creator_id = Column(Integer, ForeignKey("users.id", ondelete='SET NULL'))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+
+class SearchDocument(Base):
+    """Searchable text of a task, comment, project or user story, see search.py"""
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        Index("ix_search_documents_kind_object_id", "kind", "object_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    object_id = Column(Integer, nullable=False)
+    # Scope for visibility checks and cleanup
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete='CASCADE'), nullable=False, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete='CASCADE'), index=True)
+    title = Column(Text, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+
+
+# The inverted index over search_documents: an external content FTS5 table
+# kept in sync by triggers on SQLite, a generated tsvector column with a GIN
+# index on PostgreSQL. Migration 0005 creates the same objects.
+SEARCH_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE search_index USING fts5("
+        "title, body, content='search_documents', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_index(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_index(search_index, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+        "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_index(search_index, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+        "INSERT INTO search_index(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')) STORED",
+        "CREATE INDEX ix_search_documents_search_vector ON search_documents USING GIN (search_vector)",
+    ],
+}
+
+for _dialect, _statements in SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(
+    SearchDocument.__table__, "after_drop", DDL("DROP TABLE IF EXISTS search_index").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered by primary key and `?after=<cursor>` continues after the
+last row of the previous page, so every page is an index range scan instead
+of an OFFSET that has to skip all earlier rows. The cursor is an opaque
+token; the next page is advertised in a `Link: <...>; rel="next"` header so
+the JSON body keeps its existing shape. `skip` stays available for clients
+that page by offset.
+
+Lists ordered by another column (comments by created_at) use
+paginate_sorted: the cursor is still the last row's id, and the sort value
+is read back from that row so it is compared in its stored form.
+"""
+import base64
+import json
+from typing import Any, List, Optional
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import and_, or_, select
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return values
+
+
+def decode_key(cursor: str) -> int:
+    last_key = decode_cursor(cursor)[0]
+    if not isinstance(last_key, int):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return last_key
+
+
+def paginate(query, key_column, after: Optional[str], skip: int, limit: int):
+    """Order query by key_column and apply the cursor, or the offset when no cursor is given"""
+    query = query.order_by(key_column)
+    if after is not None:
+        return query.filter(key_column > decode_key(after)).limit(limit)
+    return query.offset(skip).limit(limit)
+
+
+def paginate_sorted(query, sort_column, key_column, after: Optional[str], limit: int):
+    """Order query by (sort_column, key_column) and continue after the row whose key is in the cursor"""
+    query = query.order_by(sort_column, key_column)
+    if after is not None:
+        last_key = decode_key(after)
+        last_sort = select(sort_column).where(key_column == last_key).scalar_subquery()
+        query = query.filter(or_(
+            sort_column > last_sort,
+            and_(sort_column == last_sort, key_column > last_key)
+        ))
+    return query.limit(limit)
+
+
+def set_next_link(request: Request, response: Response, items: List[Any], limit: int, key=lambda item: item.id):
+    """Advertise the next page in a Link header when the current page is full"""
+    if not items or len(items) < limit:
+        return
+    next_url = request.url.remove_query_params("skip").include_query_params(after=encode_cursor(key(items[-1])))
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -1,26 +1,68 @@
+import json
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from groq import Groq
-from .. import models, schemas, auth
+from typing import AsyncIterator, List, Optional
+from groq import APITimeoutError
+from .. import models, schemas, auth, membership, groq_client, story_cache, jobs, bulk, search
 from ..database import get_db
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/ai", tags=["AI Features"])
 
+# Bump whenever the prompt changes so cached stories from the old prompt miss
+PROMPT_VERSION = 1
 
-def generate_user_stories_with_groq(project_description: str) -> List[str]:
-    """Generate user stories using GROQ API"""
+
+def parse_story_line(line: str) -> Optional[str]:
+    """The user story on one line of a completion, None when the line holds none"""
+    line = line.strip()
+    # Remove numbering if present
+    if line and (line.startswith('As a') or line.startswith('- As a') or any(c.isdigit() for c in line[:3])):
+        # Clean up the line
+        cleaned_line = line.lstrip('0123456789.-) ')
+        if cleaned_line.startswith('As a'):
+            return cleaned_line
+    return None
+
+
+def parse_user_stories(response_text: str) -> List[str]:
+    """Extract "As a ..." lines from a completion, falling back to the whole text"""
+    user_stories = [story for story in map(parse_story_line, response_text.strip().split('\n')) if story]
+    return user_stories if user_stories else [response_text]
+
+
+class StoryLineParser:
+    """Runs parse_story_line over streamed text as each line completes"""
+
+    def __init__(self):
+        self.text = ""
+        self._pending = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        self.text += chunk
+        *lines, self._pending = (self._pending + chunk).split('\n')
+        return [story for story in map(parse_story_line, lines) if story]
+
+    def close(self) -> List[str]:
+        story = parse_story_line(self._pending)
+        self._pending = ""
+        return [story] if story else []
+
+
+def require_groq_key():
     if not settings.GROQ_API_KEY:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="GROQ API key not configured"
         )
-    
-    try:
-        client = Groq(api_key=settings.GROQ_API_KEY)
-        
-        prompt = f"""You are a product manager expert. Generate detailed user stories from the following project description.
+
+
+def user_story_messages(project_description: str) -> List[dict]:
+    prompt = f"""You are a product manager expert. Generate detailed user stories from the following project description.
 
 Project Description:
 {project_description}
@@ -30,113 +72,218 @@ Generate user stories in the format: "As a [role], I want to [action], so that [
 Provide 5-10 comprehensive user stories that cover the main features and requirements.
 Return ONLY the user stories, one per line, without numbering or additional text."""
 
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a product manager who writes clear, actionable user stories."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            model="llama-3.3-70b-versatile",  
+    return [
+        {
+            "role": "system",
+            "content": "You are a product manager who writes clear, actionable user stories."
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+
+async def generate_user_stories_with_groq(project_description: str) -> List[str]:
+    """Generate user stories using GROQ API"""
+    require_groq_key()
+    
+    try:
+        chat_completion = await groq_client.get_client().chat.completions.create(
+            messages=user_story_messages(project_description),
+            model=settings.GROQ_MODEL,
             temperature=0.7,
             max_tokens=1024
         )
         
-        response_text = chat_completion.choices[0].message.content
-        
-        # Parse user stories from response
-        user_stories = []
-        for line in response_text.strip().split('\n'):
-            line = line.strip()
-            # Remove numbering if present
-            if line and (line.startswith('As a') or line.startswith('- As a') or any(c.isdigit() for c in line[:3])):
-                # Clean up the line
-                cleaned_line = line.lstrip('0123456789.-) ')
-                if cleaned_line.startswith('As a'):
-                    user_stories.append(cleaned_line)
-        
-        return user_stories if user_stories else [response_text]
+        return parse_user_stories(chat_completion.choices[0].message.content)
     
+    except APITimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Timed out waiting for the AI service"
+        )
     except Exception as e:
-        import traceback
-        print(f"GROQ API Error: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("GROQ API error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating user stories: {str(e)}"
         )
 
 
+async def stream_user_stories_with_groq(project_description: str) -> AsyncIterator[str]:
+    """Yield each user story as soon as its line of the streamed completion is complete"""
+    require_groq_key()
+    stream = await groq_client.get_client().chat.completions.create(
+        messages=user_story_messages(project_description),
+        model=settings.GROQ_MODEL,
+        temperature=0.7,
+        max_tokens=1024,
+        stream=True
+    )
+    parser = StoryLineParser()
+    found = False
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            for story in parser.feed(chunk.choices[0].delta.content):
+                found = True
+                yield story
+    for story in parser.close():
+        found = True
+        yield story
+    if not found and parser.text:
+        # Same fallback as parse_user_stories
+        yield parser.text
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def generate_user_stories_cached(project_description: str, refresh: bool = False) -> List[str]:
+    """Stories for a description from the story cache, generated on a miss or when refresh is set"""
+    key = story_cache.cache_key(project_description, settings.GROQ_MODEL, PROMPT_VERSION)
+    if not refresh:
+        user_stories = await story_cache.get(key)
+        if user_stories is not None:
+            return user_stories
+    user_stories = await generate_user_stories_with_groq(project_description)
+    await story_cache.put(key, user_stories)
+    return user_stories
+
+
 @router.post("/generate-user-stories", response_model=List[str])
-def generate_user_stories(
+async def generate_user_stories(
     request: schemas.UserStoryGenerate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+    refresh: bool = False,
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
 ):
-    """Generate user stories from project description using AI (Admin and Manager only)"""
-    user_stories = generate_user_stories_with_groq(request.projectDescription)
+    """Generate user stories from project description using AI (Admin and Manager only, ?refresh=true skips the cache)"""
+    user_stories = await generate_user_stories_cached(request.projectDescription, refresh)
     return user_stories
 
 
-@router.post("/generate-and-save/{project_id}", response_model=List[schemas.UserStoryResponse])
+@router.post("/generate-user-stories/stream")
+async def stream_user_stories(
+    request: schemas.UserStoryGenerate,
+    refresh: bool = False,
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+):
+    """Generate user stories as Server-Sent Events: a `story` event per story as soon as it is complete, then `done`"""
+    key = story_cache.cache_key(request.projectDescription, settings.GROQ_MODEL, PROMPT_VERSION)
+    cached = None if refresh else await story_cache.get(key)
+    if cached is None:
+        require_groq_key()
+
+    async def events():
+        if cached is not None:
+            for story in cached:
+                yield sse_event("story", story)
+            yield sse_event("done", {"count": len(cached)})
+            return
+        user_stories = []
+        try:
+            async for story in stream_user_stories_with_groq(request.projectDescription):
+                user_stories.append(story)
+                yield sse_event("story", story)
+        except APITimeoutError:
+            yield sse_event("error", {"detail": "Timed out waiting for the AI service"})
+            return
+        except Exception as e:
+            logger.exception("GROQ API error while streaming stories: %s", e)
+            yield sse_event("error", {"detail": f"Error generating user stories: {str(e)}"})
+            return
+        await story_cache.put(key, user_stories)
+        yield sse_event("done", {"count": len(user_stories)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def add_user_stories(db: Session, project_id: int, creator_id: Optional[int], user_stories: List[str]) -> List[models.UserStory]:
+    db_stories = bulk.insert_returning(db, models.UserStory, [
+        {"story": story, "project_id": project_id, "creator_id": creator_id}
+        for story in user_stories
+    ])
+    search.index_user_stories(db, [story.id for story in db_stories])
+    return db_stories
+
+
+@jobs.handler("generate_and_save")
+async def run_generate_and_save(job: models.Job) -> jobs.Finish:
+    """Generate the stories for a generate-and-save job, then save them when the job completes"""
+    user_stories = await generate_user_stories_cached(
+        job.payload["project_description"], job.payload.get("refresh", False)
+    )
+
+    def save(db: Session) -> dict:
+        if db.get(models.Project, job.project_id) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        db_stories = add_user_stories(db, job.project_id, job.creator_id, user_stories)
+        return {"story_ids": [story.id for story in db_stories]}
+
+    return save
+
+
+def job_response(db: Session, job: models.Job) -> schemas.JobResponse:
+    response = schemas.JobResponse.model_validate(job)
+    if job.result and job.result.get("story_ids"):
+        stories = db.query(models.UserStory).filter(
+            models.UserStory.id.in_(job.result["story_ids"])
+        ).order_by(models.UserStory.id).all()
+        response.stories = [schemas.UserStoryResponse.model_validate(story) for story in stories]
+    return response
+
+
+@router.post("/generate-and-save/{project_id}", response_model=schemas.JobResponse, status_code=status.HTTP_202_ACCEPTED)
 def generate_and_save_user_stories(
     project_id: int,
     request: schemas.UserStoryGenerate,
+    refresh: bool = False,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
 ):
-    """Generate user stories and save them to a project"""
-    try:
-        # Check if project exists
-        project = db.query(models.Project).filter(models.Project.id == project_id).first()
-        if not project:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        # Generate user stories
-        print(f"Generating stories for project {project_id}")
-        user_stories = generate_user_stories_with_groq(request.projectDescription)
-        print(f"Generated {len(user_stories)} stories")
-        
-        # Save to database
-        db_stories = []
-        for story in user_stories:
-            print(f"Saving story: {story[:50]}...")
-            db_story = models.UserStory(
-                story=story,
-                project_id=project_id,
-                creator_id=current_user.id
-            )
-            db.add(db_story)
-            db_stories.append(db_story)
-        
-        db.commit()
-        for story in db_stories:
-            db.refresh(story)
-        
-        print(f"Successfully saved {len(db_stories)} stories")
-        return db_stories
-    except HTTPException:
-        raise
-    except Exception as e:
-        import traceback
-        print(f"Error in generate_and_save: {str(e)}")
-        print(traceback.format_exc())
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error saving user stories: {str(e)}"
-        )
+    """Queue generating user stories and saving them to a project, poll GET /api/ai/jobs/{id} for the outcome (?refresh=true skips the cache)"""
+    # Check if project exists
+    project = db.query(models.Project.id).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    job = jobs.enqueue(
+        db,
+        "generate_and_save",
+        {"project_description": request.projectDescription, "refresh": refresh},
+        project_id=project_id,
+        creator_id=current_user.id
+    )
+    db.commit()
+    db.refresh(job)
+    jobs.worker.notify()
+    return job_response(db, job)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+):
+    """Get the status of a background job and, once it succeeded, its results"""
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(db, job)
 
 
 @router.get("/user-stories/{project_id}", response_model=List[schemas.UserStoryResponse])
 def get_project_user_stories(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Get all user stories for a project"""
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -145,7 +292,7 @@ def get_project_user_stories(
     
     # Check permissions
     if current_user.role == models.UserRole.DEVELOPER:
-        if current_user not in project.team_members:
+        if not membership.is_member(db, current_user.id, project_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a member of this project"
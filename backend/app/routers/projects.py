@@ -1,17 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import List
-from .. import models, schemas, auth
+from typing import List, Literal, Optional
+from .. import models, schemas, auth, pagination, membership, etag, serialization, export, task_import, search, eager
+from ..async_routes import run_db
 from ..database import get_db
+from ..membership import member_project_ids
 
 router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
 
+def query_projects_with_task_count(db: Session):
+    """Projects paired with their task count, nested fields of ProjectResponse loaded up front"""
+    return eager.load(db.query(
+        models.Project,
+        func.coalesce(models.ProjectTaskCounter.total_count, 0)
+    ).outerjoin(models.Project.task_counter), schemas.ProjectResponse)
+
+
+# Project lists are built from column rows, see serialization.py
+PROJECT_ROWS = serialization.RowPlan(
+    schemas.ProjectResponse,
+    models.Project,
+    extra={"task_count": func.coalesce(models.ProjectTaskCounter.total_count, 0)}
+)
+MEMBER_ROWS = serialization.RowPlan(schemas.UserResponse, models.User)
+
+
+# Team size and last change to a team member, for the ETag fingerprint
+MEMBER_COUNT = (
+    select(func.count(models.project_members.c.user_id))
+    .where(models.project_members.c.project_id == models.Project.id)
+    .correlate(models.Project)
+    .scalar_subquery()
+)
+MEMBERS_UPDATED_AT = (
+    select(func.max(models.User.updated_at))
+    .join_from(models.project_members, models.User, models.User.id == models.project_members.c.user_id)
+    .where(models.project_members.c.project_id == models.Project.id)
+    .correlate(models.Project)
+    .scalar_subquery()
+)
+
+
+def project_page_version(db: Session, page) -> tuple:
+    """ETag fingerprint of a page of projects, read from only its rows"""
+    return etag.page_version(
+        db, page,
+        sums=(models.Project.id, MEMBER_COUNT),
+        maxes=(models.Project.updated_at, models.ProjectTaskCounter.updated_at, MEMBERS_UPDATED_AT)
+    )
+
+
+def project_dicts(db: Session, rows) -> List[dict]:
+    """PROJECT_ROWS dicts with their team members, read in one extra query"""
+    projects = PROJECT_ROWS.to_dicts(rows)
+    by_id = {project["id"]: project for project in projects}
+    if by_id:
+        member_rows = db.execute(
+            select(models.project_members.c.project_id, *MEMBER_ROWS.columns)
+            .join_from(models.project_members, models.User, models.User.id == models.project_members.c.user_id)
+            .where(models.project_members.c.project_id.in_(by_id))
+            .order_by(models.project_members.c.project_id, models.User.id)
+        ).all()
+        for row, member in zip(member_rows, MEMBER_ROWS.to_dicts(member_rows)):
+            by_id[row.project_id]["team_members"].append(member)
+    return projects
+
+
+def attach_task_counts(rows) -> List[models.Project]:
+    projects = []
+    for project, task_count in rows:
+        project.task_count = task_count
+        projects.append(project)
+    return projects
+
+
 @router.post("/", response_model=schemas.ProjectResponse, status_code=status.HTTP_201_CREATED)
 def create_project(
     project: schemas.ProjectCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
 ):
     """Create a new project (Admin and Manager only)"""
     db_project = models.Project(
@@ -20,7 +90,8 @@ def create_project(
         status=project.status,
         start_date=project.start_date,
         end_date=project.end_date,
-        creator_id=current_user.id
+        creator_id=current_user.id,
+        task_counter=models.ProjectTaskCounter()
     )
     
     # Add team members
@@ -29,55 +100,127 @@ def create_project(
         db_project.team_members = team_members
     
     db.add(db_project)
+    db.flush()
+    search.index_projects(db, [db_project.id])
     db.commit()
-    db.refresh(db_project)
-    return db_project
+    membership.invalidate(member.id for member in db_project.team_members)
+    return eager.load(db.query(models.Project), schemas.ProjectResponse).filter(
+        models.Project.id == db_project.id
+    ).one()
 
 
 @router.get("/", response_model=List[schemas.ProjectResponse])
 def get_projects(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
-    """Get all projects (filtered by role)"""
-    if current_user.role in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
-        projects = db.query(models.Project).offset(skip).limit(limit).all()
-    else:
+    """Get all projects (filtered by role, page with skip/limit or the ?after= cursor)"""
+    scope = []
+    if current_user.role not in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
         # Developers see only projects they're assigned to
-        projects = db.query(models.Project).join(
-            models.project_members
-        ).filter(models.project_members.c.user_id == current_user.id).offset(skip).limit(limit).all()
+        scope.append(models.Project.id.in_(member_project_ids(current_user.id)))
     
-    # Add task count to each project
-    for project in projects:
-        project.task_count = len(project.tasks)
+    query = db.query(models.Project).outerjoin(models.Project.task_counter).filter(*scope)
+    fingerprint = project_page_version(db, pagination.paginate(query, models.Project.id, after, skip, limit))
+    not_modified = etag.not_modified(request, response, current_user, fingerprint)
+    if not_modified:
+        return not_modified
     
-    return projects
+    rows = pagination.paginate(PROJECT_ROWS.apply(query), models.Project.id, after, skip, limit).all()
+    pagination.set_next_link(request, response, rows, limit)
+    return serialization.respond(project_dicts(db, rows), response)
 
 
 @router.get("/{project_id}", response_model=schemas.ProjectResponse)
 def get_project(
     project_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Get project by ID"""
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project:
+    fingerprint = db.execute(
+        select(
+            models.Project.updated_at,
+            models.ProjectTaskCounter.updated_at,
+            MEMBER_COUNT,
+            MEMBERS_UPDATED_AT
+        ).select_from(models.Project).outerjoin(models.Project.task_counter).where(models.Project.id == project_id)
+    ).first()
+    if not fingerprint:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Check permissions
     if current_user.role == models.UserRole.DEVELOPER:
-        if current_user not in project.team_members:
+        if not membership.is_member(db, current_user.id, project_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a member of this project"
             )
     
-    project.task_count = len(project.tasks)
-    return project
+    not_modified = etag.not_modified(request, response, current_user, tuple(fingerprint))
+    if not_modified:
+        return not_modified
+    row = query_projects_with_task_count(db).filter(models.Project.id == project_id).one()
+    return attach_task_counts([row])[0]
+
+
+@router.get("/{project_id}/export")
+def export_project_tasks(
+    project_id: int,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    include_comments: bool = False,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_principal)
+):
+    """Stream every task of a project as NDJSON or CSV"""
+    if not db.execute(select(models.Project.id).where(models.Project.id == project_id)).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Check permissions
+    if current_user.role == models.UserRole.DEVELOPER:
+        if not membership.is_member(db, current_user.id, project_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a member of this project"
+            )
+    
+    return StreamingResponse(
+        export.chunks(format, project_id, include_comments),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-tasks.{format}"'}
+    )
+
+
+@router.post("/{project_id}/import", response_model=schemas.TaskImportResult)
+async def import_project_tasks(
+    project_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_principal)
+):
+    """Import tasks from an NDJSON or CSV request body, streamed as it is received"""
+    def check_project(db: Session):
+        if not db.execute(select(models.Project.id).where(models.Project.id == project_id)).first():
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        # Check permissions
+        if current_user.role == models.UserRole.DEVELOPER:
+            if not membership.is_member(db, current_user.id, project_id):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not a member of this project"
+                )
+    
+    await run_db(db, check_project)
+    return await task_import.import_tasks(db, request.stream(), format, project_id, current_user.id)
 
 
 @router.put("/{project_id}", response_model=schemas.ProjectResponse)
@@ -85,7 +228,7 @@ def update_project(
     project_id: int,
     project_update: schemas.ProjectUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
 ):
     """Update project (Admin and Manager only)"""
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -93,33 +236,44 @@ def update_project(
         raise HTTPException(status_code=404, detail="Project not found")
     
     update_data = project_update.dict(exclude_unset=True)
+    changed_member_ids = set()
     
     # Handle team members separately
     if "team_member_ids" in update_data:
         team_member_ids = update_data.pop("team_member_ids")
         team_members = db.query(models.User).filter(models.User.id.in_(team_member_ids)).all()
+        changed_member_ids.update(member.id for member in project.team_members)
+        changed_member_ids.update(member.id for member in team_members)
         project.team_members = team_members
+        # The team is not a column of projects; bump updated_at for etag.py
+        project.updated_at = models.utcnow()
     
     for field, value in update_data.items():
         setattr(project, field, value)
     
+    if "name" in update_data or "description" in update_data:
+        search.index_projects(db, [project_id])
     db.commit()
-    db.refresh(project)
-    project.task_count = len(project.tasks)
-    return project
+    membership.invalidate(changed_member_ids)
+    # Reload the committed project together with its task count and team
+    row = query_projects_with_task_count(db).filter(models.Project.id == project_id).one()
+    return attach_task_counts([row])[0]
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
 ):
     """Delete project (Admin and Manager only)"""
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    member_ids = [member.id for member in project.team_members]
+    search.remove_project(db, project_id)
     db.delete(project)
     db.commit()
+    membership.invalidate(member_ids)
     return None
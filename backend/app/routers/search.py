@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from .. import schemas, auth, search
+from ..database import get_db
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+
+@router.get("/", response_model=List[schemas.SearchResult])
+def search_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[List[Literal["task", "comment", "project", "user_story"]]] = Query(None),
+    project_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_principal)
+):
+    """Search tasks, comments, projects and user stories visible to the current user"""
+    return search.search(db, current_user, q, kinds=kind, project_id=project_id, limit=limit)
@@ -1,18 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-from .. import models, schemas, auth
+from .. import models, schemas, auth, counters, pagination, membership, bulk, etag, serialization, search, eager
+from ..membership import member_project_ids
 from ..database import get_db
 
 router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 
+# Counted from ix_comments_task_id_created_at without loading the thread
+COMMENT_COUNT = (
+    select(func.count(models.Comment.id))
+    .where(models.Comment.task_id == models.Task.id)
+    .correlate(models.Task)
+    .scalar_subquery()
+)
+
+# Last change to a task's assignee, for the ETag fingerprint
+ASSIGNEE_UPDATED_AT = (
+    select(models.User.updated_at)
+    .where(models.User.id == models.Task.assignee_id)
+    .correlate(models.Task)
+    .scalar_subquery()
+)
+
+# Task lists are built from column rows, see serialization.py
+TASK_ROWS = serialization.RowPlan(schemas.TaskResponse, models.Task, extra={"comment_count": COMMENT_COUNT})
+
+
+def task_page_version(db: Session, page) -> tuple:
+    """ETag fingerprint of a page of tasks, read from only its rows"""
+    return etag.page_version(
+        db, page,
+        sums=(models.Task.id, models.Task.assignee_id, COMMENT_COUNT),
+        maxes=(models.Task.updated_at, ASSIGNEE_UPDATED_AT)
+    )
+
 
 @router.post("/", response_model=schemas.TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(
     task: schemas.TaskCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Create a new task"""
     # Check if project exists
@@ -22,7 +52,7 @@ def create_task(
     
     # Check permissions
     if current_user.role == models.UserRole.DEVELOPER:
-        if current_user not in project.team_members:
+        if not membership.is_member(db, current_user.id, project.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not a member of this project"
@@ -39,22 +69,178 @@ def create_task(
         creator_id=current_user.id
     )
     db.add(db_task)
+    db.flush()
+    counters.task_added(db, db_task.project_id, db_task.status)
+    search.index_tasks(db, [db_task.id])
+    db.commit()
+    return eager.load(db.query(models.Task), schemas.TaskResponse).filter(models.Task.id == db_task.id).one()
+
+
+@router.post("/bulk", response_model=List[schemas.TaskResponse], status_code=status.HTTP_201_CREATED)
+def create_tasks_bulk(
+    bulk_create: schemas.TaskBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_principal)
+):
+    """Create up to 10000 tasks in one transaction"""
+    # Check that every project exists and, for developers, is theirs
+    project_ids = {task.project_id for task in bulk_create.tasks}
+    existing_ids = set(db.execute(
+        select(models.Project.id).where(models.Project.id.in_(project_ids))
+    ).scalars())
+    if project_ids - existing_ids:
+        raise HTTPException(status_code=404, detail=f"Project not found: {min(project_ids - existing_ids)}")
+    if current_user.role == models.UserRole.DEVELOPER:
+        if not project_ids <= membership.visible_project_ids(db, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a member of this project"
+            )
+    
+    db_tasks = bulk.insert_returning(db, models.Task, [
+        {**task.model_dump(), "creator_id": current_user.id}
+        for task in bulk_create.tasks
+    ])
+    counters.tasks_added(db, [(task.project_id, task.status) for task in db_tasks])
+    search.index_tasks(db, [task.id for task in db_tasks])
+    
+    # Load what the response nests in one query, then serialize before the commit expires the tasks
+    db_tasks = eager.load(db.query(models.Task), List[schemas.TaskResponse]).filter(
+        models.Task.id.in_([task.id for task in db_tasks])
+    ).order_by(models.Task.id).all()
+    created = [schemas.TaskResponse.model_validate(task) for task in db_tasks]
+    db.commit()
+    return created
+
+
+def batch_filter_conditions(task_filter: schemas.TaskBatchFilter, current_user: auth.Principal, values: Optional[dict] = None) -> list:
+    """Conditions matching a batch filter; with values, matching the same tasks once values are written"""
+    criteria = [
+        (name, value) for name, value in task_filter.model_dump().items() if value is not None
+    ]
+    if current_user.role == models.UserRole.DEVELOPER:
+        # A filter only ever matches the developer's own tasks
+        criteria.append(("assignee_id", current_user.id))
+    values = values or {}
+    return [getattr(models.Task, name) == values.get(name, value) for name, value in criteria]
+
+
+def update_matching_tasks(
+    db: Session,
+    task_filter: schemas.TaskBatchFilter,
+    fields: schemas.TaskUpdate,
+    current_user: auth.Principal
+) -> schemas.TaskBatchResult:
+    """The filter form of a batch update: one UPDATE over the matching tasks, whatever their number"""
+    values = fields.model_dump(exclude_unset=True)
+    if current_user.role == models.UserRole.DEVELOPER:
+        # Developers can only update status
+        values = {k: v for k, v in values.items() if k in {"status"}}
+    conditions = batch_filter_conditions(task_filter, current_user)
+    if not values:
+        return schemas.TaskBatchResult(
+            updated=db.execute(select(func.count(models.Task.id)).where(*conditions)).scalar()
+        )
+    
+    if "status" in values:
+        # Counter changes from one grouped count of the tasks whose status changes
+        counters.task_groups_status_changed(db, [
+            (row.project_id, row.status, values["status"], row.count)
+            for row in db.execute(
+                select(models.Task.project_id, models.Task.status, func.count(models.Task.id).label("count"))
+                .where(*conditions, models.Task.status != values["status"])
+                .group_by(models.Task.project_id, models.Task.status)
+            )
+        ])
+    updated = db.execute(
+        update(models.Task)
+        .where(*conditions)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if {"title", "description"} & values.keys():
+        search.index_selected(db, "task", select(models.Task.id).where(
+            *batch_filter_conditions(task_filter, current_user, values)
+        ))
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    return schemas.TaskBatchResult(updated=updated)
+
+
+@router.patch("/batch", response_model=schemas.TaskBatchResult)
+def update_tasks_batch(
+    batch: schemas.TaskBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_principal)
+):
+    """Update many tasks in one transaction, reporting the outcome per task"""
+    if batch.filter is not None:
+        return update_matching_tasks(db, batch.filter, batch.fields, current_user)
+    
+    is_developer = current_user.role == models.UserRole.DEVELOPER
+    requested = [(item.id, item.fields.model_dump(exclude_unset=True)) for item in batch.updates]
+    rows = {row.id: row for row in db.execute(
+        select(models.Task.id, models.Task.project_id, models.Task.assignee_id, models.Task.status)
+        .where(models.Task.id.in_({task_id for task_id, _ in requested}))
+    )}
+    
+    # Check permissions row by row, then group tasks getting the same values
+    results = []
+    groups = {}
+    status_changes = []
+    for task_id, update_data in requested:
+        row = rows.get(task_id)
+        if row is None:
+            results.append(schemas.TaskBatchRowResult(id=task_id, result="not_found", detail="Task not found"))
+            continue
+        if is_developer:
+            # Developers can only update status of their assigned tasks
+            if row.assignee_id != current_user.id:
+                results.append(schemas.TaskBatchRowResult(
+                    id=task_id, result="forbidden", detail="Not authorized to update this task"
+                ))
+                continue
+            update_data = {k: v for k, v in update_data.items() if k in {"status"}}
+        results.append(schemas.TaskBatchRowResult(id=task_id, result="updated"))
+        if not update_data:
+            continue
+        groups.setdefault(tuple(sorted(update_data.items())), []).append(task_id)
+        if "status" in update_data and update_data["status"] != row.status:
+            status_changes.append((row.project_id, row.status, update_data["status"]))
+    
+    # One UPDATE ... WHERE id IN (...) per distinct set of values
+    reindex_ids = []
+    for values, task_ids in groups.items():
+        db.execute(
+            update(models.Task)
+            .where(models.Task.id.in_(task_ids))
+            .values(dict(values))
+            .execution_options(synchronize_session=False)
+        )
+        if {"title", "description"} & dict(values).keys():
+            reindex_ids.extend(task_ids)
+    counters.tasks_status_changed(db, status_changes)
+    search.index_tasks(db, reindex_ids)
+    db.commit()
+    return schemas.TaskBatchResult(
+        updated=sum(1 for result in results if result.result == "updated"),
+        results=results
+    )
 
 
 @router.get("/", response_model=List[schemas.TaskResponse])
 def get_tasks(
+    request: Request,
+    response: Response,
     project_id: Optional[int] = None,
     status: Optional[str] = None,
     assignee_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
-    """Get tasks with optional filters"""
+    """Get tasks with optional filters (page with skip/limit or the ?after= cursor)"""
     query = db.query(models.Task)
     
     if project_id:
@@ -69,46 +255,70 @@ def get_tasks(
     # Filter by user role
     if current_user.role == models.UserRole.DEVELOPER:
         # Developers see only tasks assigned to them or in their projects
-        query = query.join(models.Project).join(
-            models.project_members
-        ).filter(
+        query = query.filter(
             (models.Task.assignee_id == current_user.id) | 
-            (models.project_members.c.user_id == current_user.id)
+            (models.Task.project_id.in_(member_project_ids(current_user.id)))
         )
     
-    tasks = query.offset(skip).limit(limit).all()
-    return tasks
+    fingerprint = task_page_version(db, pagination.paginate(query, models.Task.id, after, skip, limit))
+    not_modified = etag.not_modified(request, response, current_user, fingerprint)
+    if not_modified:
+        return not_modified
+    
+    rows = pagination.paginate(TASK_ROWS.apply(query), models.Task.id, after, skip, limit).all()
+    pagination.set_next_link(request, response, rows, limit)
+    return serialization.respond(TASK_ROWS.to_dicts(rows), response)
 
 
 @router.get("/my-tasks", response_model=List[schemas.TaskResponse])
 def get_my_tasks(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Get tasks assigned to current user"""
-    tasks = db.query(models.Task).filter(models.Task.assignee_id == current_user.id).all()
-    return tasks
+    query = db.query(models.Task).filter(models.Task.assignee_id == current_user.id)
+    fingerprint = task_page_version(db, query)
+    not_modified = etag.not_modified(request, response, current_user, fingerprint)
+    if not_modified:
+        return not_modified
+    rows = TASK_ROWS.apply(query).order_by(models.Task.id).all()
+    return serialization.respond(TASK_ROWS.to_dicts(rows), response)
 
 
 @router.get("/{task_id}", response_model=schemas.TaskResponse)
 def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Get task by ID"""
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
+    row = db.execute(
+        select(
+            models.Task.project_id, models.Task.assignee_id, models.Task.updated_at,
+            COMMENT_COUNT.label("comment_count"), ASSIGNEE_UPDATED_AT.label("assignee_updated_at")
+        )
+        .where(models.Task.id == task_id)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Task not found")
     
     # Check permissions
     if current_user.role == models.UserRole.DEVELOPER:
-        if task.assignee_id != current_user.id and current_user not in task.project.team_members:
+        if row.assignee_id != current_user.id and not membership.is_member(db, current_user.id, row.project_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this task"
             )
     
+    not_modified = etag.not_modified(request, response, current_user, tuple(row))
+    if not_modified:
+        return not_modified
+    task = eager.load(db.query(models.Task), schemas.TaskResponse).filter(models.Task.id == task_id).one()
+    task.comment_count = row.comment_count
     return task
 
 
@@ -117,7 +327,7 @@ def update_task(
     task_id: int,
     task_update: schemas.TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Update task"""
     task = db.query(models.Task).filter(models.Task.id == task_id).first()
@@ -138,11 +348,17 @@ def update_task(
     else:
         update_data = task_update.dict(exclude_unset=True)
     
+    old_status = task.status
     for field, value in update_data.items():
         setattr(task, field, value)
     
+    if "status" in update_data:
+        counters.task_status_changed(db, task.project_id, old_status, task.status)
+    if "title" in update_data or "description" in update_data:
+        search.index_tasks(db, [task_id])
     db.commit()
-    db.refresh(task)
+    task = eager.load(db.query(models.Task), schemas.TaskResponse).filter(models.Task.id == task_id).one()
+    task.comment_count = db.execute(select(COMMENT_COUNT).where(models.Task.id == task_id)).scalar()
     return task
 
 
@@ -150,14 +366,16 @@ def update_task(
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN, models.UserRole.MANAGER]))
 ):
     """Delete task (Admin and Manager only)"""
     task = db.query(models.Task).filter(models.Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    search.remove_task(db, task_id)
     db.delete(task)
+    counters.task_removed(db, task.project_id, task.status)
     db.commit()
     return None
 
@@ -167,7 +385,7 @@ def add_comment(
     task_id: int,
     comment: schemas.CommentBase,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Add comment to task"""
     task = db.query(models.Task).filter(models.Task.id == task_id).first()
@@ -180,20 +398,33 @@ def add_comment(
         author_id=current_user.id
     )
     db.add(db_comment)
+    db.flush()
+    search.index_comments(db, [db_comment.id])
     db.commit()
-    db.refresh(db_comment)
-    return db_comment
+    return eager.load(db.query(models.Comment), schemas.CommentResponse).filter(
+        models.Comment.id == db_comment.id
+    ).one()
 
 
 @router.get("/{task_id}/comments", response_model=List[schemas.CommentResponse])
 def get_comments(
     task_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
-    """Get all comments for a task"""
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
+    """Get a task's comments, oldest first (page with limit and the ?after= cursor)"""
+    if not db.execute(select(models.Task.id).where(models.Task.id == task_id)).first():
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return task.comments
+    query = eager.load(db.query(models.Comment), List[schemas.CommentResponse]).filter(
+        models.Comment.task_id == task_id
+    )
+    comments = pagination.paginate_sorted(
+        query, models.Comment.created_at, models.Comment.id, after, limit
+    ).all()
+    pagination.set_next_link(request, response, comments, limit)
+    return comments
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from .. import models, schemas, auth
+from typing import List, Optional
+from .. import models, schemas, auth, pagination, membership, search
 from ..database import get_db
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
@@ -9,18 +9,22 @@ router = APIRouter(prefix="/api/users", tags=["Users"])
 
 @router.get("/", response_model=List[schemas.UserResponse])
 def get_users(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
-    """Get all users (Admin and Manager only)"""
+    """Get all users (Admin and Manager only, page with skip/limit or the ?after= cursor)"""
     if current_user.role not in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    users = db.query(models.User).offset(skip).limit(limit).all()
+    users = pagination.paginate(db.query(models.User), models.User.id, after, skip, limit).all()
+    pagination.set_next_link(request, response, users, limit)
     return users
 
 
@@ -28,7 +32,7 @@ def get_users(
 def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Get user by ID"""
     user = db.query(models.User).filter(models.User.id == user_id).first()
@@ -42,7 +46,7 @@ def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: auth.Principal = Depends(auth.get_current_principal)
 ):
     """Update user (Admin only or self)"""
     if current_user.role != models.UserRole.ADMIN and current_user.id != user_id:
@@ -63,6 +67,7 @@ def update_user(
         setattr(user, field, value)
     
     db.commit()
+    auth.invalidate_principal(user_id)
     db.refresh(user)
     return user
 
@@ -71,13 +76,16 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.require_role([models.UserRole.ADMIN]))
+    current_user: auth.Principal = Depends(auth.require_role([models.UserRole.ADMIN]))
 ):
     """Delete user (Admin only)"""
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    search.remove_user(db, user_id)
     db.delete(user)
     db.commit()
+    auth.invalidate_principal(user_id)
+    membership.invalidate([user_id])
     return None
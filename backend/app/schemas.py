@@ -1,7 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
-from .models import UserRole, TaskStatus
+from .models import UserRole, TaskStatus, JobStatus
 
 
 # User Schemas
@@ -90,6 +90,10 @@ class TaskCreate(TaskBase):
     assignee_id: Optional[int] = None
 
 
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=10000)
+
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -99,6 +103,70 @@ class TaskUpdate(BaseModel):
     assignee_id: Optional[int] = None
 
 
+class TaskImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class TaskImportResult(BaseModel):
+    imported: int
+    failed: int
+    # The first task_import.MAX_ERRORS failures
+    errors: List[TaskImportError]
+
+
+class TaskBatchItem(BaseModel):
+    id: int
+    fields: TaskUpdate
+
+
+class TaskBatchFilter(BaseModel):
+    project_id: Optional[int] = None
+    status: Optional[TaskStatus] = None
+    assignee_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def not_empty(self):
+        if self.project_id is None and self.status is None and self.assignee_id is None:
+            raise ValueError("filter needs at least one of project_id, status, assignee_id")
+        return self
+
+
+# TaskUpdate fields backed by NOT NULL columns
+BATCH_NOT_NULL_FIELDS = ("title", "status")
+
+
+class TaskBatchUpdate(BaseModel):
+    """Either per-task updates, or one field set applied to every task matching a filter"""
+    updates: Optional[List[TaskBatchItem]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[TaskBatchFilter] = None
+    fields: Optional[TaskUpdate] = None
+
+    @model_validator(mode="after")
+    def one_form(self):
+        if (self.updates is None) == (self.filter is None) or (self.filter is None) != (self.fields is None):
+            raise ValueError("send either updates, or filter together with fields")
+        if self.updates is not None and len({item.id for item in self.updates}) != len(self.updates):
+            raise ValueError("each task may appear only once in updates")
+        for fields in [self.fields] if self.updates is None else [item.fields for item in self.updates]:
+            for name in BATCH_NOT_NULL_FIELDS:
+                if name in fields.model_fields_set and getattr(fields, name) is None:
+                    raise ValueError(f"{name} cannot be null")
+        return self
+
+
+class TaskBatchRowResult(BaseModel):
+    id: int
+    result: str
+    detail: Optional[str] = None
+
+
+class TaskBatchResult(BaseModel):
+    updated: int
+    # Per task for updates; empty for a filter, which is applied in one statement
+    results: List[TaskBatchRowResult] = []
+
+
 class TaskResponse(TaskBase):
     id: int
     project_id: int
@@ -107,6 +175,7 @@ class TaskResponse(TaskBase):
     created_at: datetime
     updated_at: Optional[datetime]
     assignee: Optional[UserResponse] = None
+    comment_count: Optional[int] = 0
 
     class Config:
         from_attributes = True
@@ -148,6 +217,23 @@ class UserStoryResponse(BaseModel):
         from_attributes = True
 
 
+# Job Schemas
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    project_id: Optional[int]
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stories: List[UserStoryResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
 # Dashboard Schemas
 class DashboardStats(BaseModel):
     total_projects: int
@@ -166,3 +252,15 @@ class ProjectStats(BaseModel):
     todo_tasks: int
     overdue_tasks: int
     completion_percentage: float
+
+
+# Search Schemas
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    project_id: int
+    task_id: Optional[int]
+    title: str
+    # Matching text with the matched words in [brackets]
+    snippet: str
+    rank: float
@@ -0,0 +1,203 @@
+"""
+Full-text search over tasks, comments, projects and user stories.
+
+Every searchable object has one row in search_documents holding its text
+and the project (and task) it belongs to. The inverted index over those rows
+is database specific (see models.SEARCH_INDEX_DDL): FTS5 on SQLite, ranked
+with bm25; a weighted tsvector with a GIN index on PostgreSQL, ranked with
+ts_rank_cd. Titles weigh more than bodies on both.
+
+Like counters.py, the routers call the index_* and remove_* helpers in the
+same transaction as the write they describe. The helpers are set-based, so
+bulk writes index their rows with two statements. `rebuild` recreates every
+document from the source tables.
+"""
+import re
+from typing import Iterable, List, Optional
+from sqlalchemy import column, delete, func, insert, literal, literal_column, null, or_, select, table, text
+from sqlalchemy.orm import Session
+from . import models
+from .auth import Principal
+from .membership import member_project_ids
+
+KINDS = ["task", "comment", "project", "user_story"]
+
+DOCUMENT_COLUMNS = ["kind", "object_id", "project_id", "task_id", "title", "body"]
+
+
+def source(kind: str):
+    """SELECT of the document columns for every object of a kind"""
+    if kind == "task":
+        task = models.Task
+        return select(
+            literal("task"), task.id, task.project_id, task.id,
+            task.title, func.coalesce(task.description, "")
+        ), task.id
+    if kind == "comment":
+        comment = models.Comment
+        return select(
+            literal("comment"), comment.id, models.Task.project_id, comment.task_id,
+            literal(""), comment.content
+        ).join(models.Task, models.Task.id == comment.task_id), comment.id
+    if kind == "project":
+        project = models.Project
+        return select(
+            literal("project"), project.id, project.id, null(),
+            project.name, func.coalesce(project.description, "")
+        ), project.id
+    if kind == "user_story":
+        story = models.UserStory
+        return select(
+            literal("user_story"), story.id, story.project_id, null(),
+            literal(""), story.story
+        ), story.id
+    raise ValueError(f"Unknown search document kind: {kind}")
+
+
+def index(db: Session, kind: str, ids: Iterable[int]):
+    """(Re)write the documents of the given objects from their current rows"""
+    ids = list(ids)
+    if ids:
+        index_selected(db, kind, ids)
+
+
+def index_selected(db: Session, kind: str, ids):
+    """index() for a list of ids or a SELECT of them, which is never read into Python"""
+    db.flush()
+    doc = models.SearchDocument
+    db.execute(delete(doc).where(doc.kind == kind, doc.object_id.in_(ids)))
+    stmt, key = source(kind)
+    db.execute(insert(doc).from_select(DOCUMENT_COLUMNS, stmt.where(key.in_(ids))))
+
+
+def index_tasks(db: Session, task_ids: Iterable[int]):
+    index(db, "task", task_ids)
+
+
+def index_comments(db: Session, comment_ids: Iterable[int]):
+    index(db, "comment", comment_ids)
+
+
+def index_projects(db: Session, project_ids: Iterable[int]):
+    index(db, "project", project_ids)
+
+
+def index_user_stories(db: Session, story_ids: Iterable[int]):
+    index(db, "user_story", story_ids)
+
+
+def remove_task(db: Session, task_id: int):
+    """Drop a task's document and those of its comments"""
+    db.execute(delete(models.SearchDocument).where(models.SearchDocument.task_id == task_id))
+
+
+def remove_project(db: Session, project_id: int):
+    """Drop every document of a project"""
+    db.execute(delete(models.SearchDocument).where(models.SearchDocument.project_id == project_id))
+
+
+def remove_user(db: Session, user_id: int):
+    """Drop the documents of a user's comments and user stories, deleted along with the user"""
+    doc = models.SearchDocument
+    db.execute(delete(doc).where(
+        doc.kind == "comment",
+        doc.object_id.in_(select(models.Comment.id).where(models.Comment.author_id == user_id))
+    ))
+    db.execute(delete(doc).where(
+        doc.kind == "user_story",
+        doc.object_id.in_(select(models.UserStory.id).where(models.UserStory.creator_id == user_id))
+    ))
+
+
+def rebuild(db: Session) -> int:
+    """Recreate every document from the source tables, returns the number of documents"""
+    doc = models.SearchDocument
+    db.execute(delete(doc))
+    for kind in KINDS:
+        stmt, _ = source(kind)
+        db.execute(insert(doc).from_select(DOCUMENT_COLUMNS, stmt))
+    if db.get_bind().dialect.name == "sqlite":
+        # Merge the index segments written row by row
+        db.execute(text("INSERT INTO search_index(search_index) VALUES ('optimize')"))
+    return db.scalar(select(func.count(doc.id)))
+
+
+def terms(q: str) -> List[str]:
+    """The words of a query; punctuation and operators are ignored"""
+    return re.findall(r"\w+", q.lower())[:20]
+
+
+def visible_condition(current_user: Principal):
+    """Developers see documents of their projects and of tasks assigned to them"""
+    doc = models.SearchDocument
+    if current_user.role in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
+        return None
+    return or_(
+        doc.project_id.in_(member_project_ids(current_user.id)),
+        doc.task_id.in_(select(models.Task.id).where(models.Task.assignee_id == current_user.id))
+    )
+
+
+def search(
+    db: Session,
+    current_user: Principal,
+    q: str,
+    kinds: Optional[List[str]] = None,
+    project_id: Optional[int] = None,
+    limit: int = 20
+) -> List[dict]:
+    """Best matching documents first.
+
+    Every word must match; the last one also as a prefix, so results follow
+    the query as it is typed. Earlier words are not prefixes because each
+    prefix expands to every indexed term starting with it.
+    """
+    words = terms(q)
+    if not words:
+        return []
+    doc = models.SearchDocument
+    conditions = []
+    if kinds:
+        conditions.append(doc.kind.in_(kinds))
+    if project_id is not None:
+        conditions.append(doc.project_id == project_id)
+    visible = visible_condition(current_user)
+    if visible is not None:
+        conditions.append(visible)
+
+    if db.get_bind().dialect.name == "postgresql":
+        query = func.to_tsquery("english", " & ".join(words[:-1] + [f"{words[-1]}:*"]))
+        vector = literal_column("search_documents.search_vector")
+        rank = func.ts_rank_cd(vector, query)
+        ranked = select(doc.id, rank.label("rank")).where(vector.op("@@")(query), *conditions).order_by(
+            rank.desc(), doc.id
+        ).limit(limit).subquery()
+        snippet = func.ts_headline("english", doc.body, query, "MaxWords=20, MinWords=5, StartSel=[, StopSel=]")
+        stmt = select(
+            doc.kind, doc.object_id, doc.project_id, doc.task_id, doc.title, snippet.label("snippet"), ranked.c.rank
+        ).join(ranked, ranked.c.id == doc.id).order_by(ranked.c.rank.desc(), doc.id)
+    else:
+        fts = table("search_index", column("rowid"))
+        fts_table = literal_column("search_index")
+        # bm25 is lower for better matches; title hits count ten times as much
+        rank = func.bm25(fts_table, 10.0, 1.0)
+        match = " ".join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+        stmt = select(
+            doc.kind, doc.object_id, doc.project_id, doc.task_id, doc.title,
+            func.snippet(fts_table, 1, "[", "]", "…", 12).label("snippet"), (-rank).label("rank")
+        ).join_from(fts, doc, doc.id == fts.c.rowid).where(
+            fts_table.op("MATCH")(match), *conditions
+        ).order_by(rank, doc.id).limit(limit)
+
+    return [
+        {
+            "kind": row.kind,
+            "id": row.object_id,
+            "project_id": row.project_id,
+            "task_id": row.task_id,
+            "title": row.title,
+            "snippet": row.snippet,
+            "rank": float(row.rank)
+        }
+        for row in db.execute(stmt)
+    ]
@@ -0,0 +1,103 @@
+"""
+Fast path for large list responses.
+
+By default FastAPI validates every returned ORM object against the
+response_model, lazy-loading nested relationships on the way, and then
+encodes the result. For list endpoints whose rows come straight from the
+database that work is redundant. `RowPlan` derives from a response schema
+the columns to select (to-one nested schemas through an outer join) and
+turns the result rows into the plain dicts the schema would have produced;
+`respond` encodes them with orjson. Returning a Response makes FastAPI skip
+its response_model validation; the schema still documents the endpoint.
+
+Fields of the schema that are neither columns nor to-one relationships
+(computed counts, collections) are passed to RowPlan as labelled
+expressions or filled in by the caller.
+"""
+import typing
+from typing import Any, Dict, List, Optional, Type
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import aliased
+
+
+class JSONResponse(ORJSONResponse):
+    """orjson encoding; UTC datetimes end in Z like Pydantic's"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def nested_schema(annotation) -> Optional[Type[BaseModel]]:
+    """The schema of a to-one nested field (X or Optional[X]), None for anything else"""
+    candidates = typing.get_args(annotation) if typing.get_origin(annotation) is typing.Union else (annotation,)
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+class RowPlan:
+    """Columns to select for a response schema and how to build its dicts from the rows"""
+
+    def __init__(self, schema: Type[BaseModel], model, extra: Optional[Dict[str, Any]] = None):
+        extra = extra or {}
+        mapper = inspect(model)
+        self.columns = []
+        self.joins = []
+        # (field name, nested field names or None for a flat field)
+        self.fields = []
+        self.defaults = {}
+        for name, field in schema.model_fields.items():
+            nested = nested_schema(field.annotation)
+            if name in extra:
+                self.columns.append(extra[name].label(name))
+                self.fields.append((name, None))
+            elif name in mapper.column_attrs:
+                self.columns.append(getattr(model, name).label(name))
+                self.fields.append((name, None))
+            elif nested is not None and name in mapper.relationships and not mapper.relationships[name].uselist:
+                target = aliased(mapper.relationships[name].mapper.class_)
+                nested_names = [
+                    nested_name for nested_name in nested.model_fields
+                    if nested_name in mapper.relationships[name].mapper.column_attrs
+                ]
+                self.columns.extend(getattr(target, nested_name).label(f"{name}__{nested_name}") for nested_name in nested_names)
+                self.joins.append(getattr(model, name).of_type(target))
+                self.fields.append((name, nested_names))
+            else:
+                self.defaults[name] = field.get_default(call_default_factory=True)
+                self.fields.append((name, None))
+
+    def apply(self, query):
+        """Select the plan's columns from a legacy Query or select() over the model"""
+        query = query.with_entities(*self.columns) if hasattr(query, "with_entities") else query.with_only_columns(*self.columns)
+        for join in self.joins:
+            query = query.outerjoin(join)
+        return query
+
+    def to_dicts(self, rows) -> List[dict]:
+        items = []
+        for row in rows:
+            values = row._mapping
+            item = {}
+            for name, nested_names in self.fields:
+                if nested_names is not None:
+                    nested = {nested_name: values[f"{name}__{nested_name}"] for nested_name in nested_names}
+                    item[name] = nested if nested.get("id") is not None else None
+                elif name in self.defaults:
+                    default = self.defaults[name]
+                    item[name] = list(default) if isinstance(default, list) else default
+                else:
+                    item[name] = values[name]
+            items.append(item)
+        return items
+
+
+def respond(content: Any, response: Response, status_code: int = 200) -> JSONResponse:
+    """Encode trusted content, keeping headers the endpoint set on its injected response"""
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return JSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,126 @@
+"""
+Aggregate queries for the dashboard endpoints.
+
+Every figure is computed in a single statement so the dashboard costs one
+database round trip regardless of how many statuses exist. Status totals come
+from the project_task_counters table (see counters.py); conditional counts use
+the CASE form instead of FILTER so the same SQL runs on SQLite and PostgreSQL.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import select, func, and_
+from sqlalchemy.orm import Session
+from . import models, counters
+from .auth import Principal
+from .membership import member_project_ids
+
+
+def overdue_condition(now: datetime):
+    return and_(
+        models.Task.deadline < now,
+        models.Task.status != models.TaskStatus.DONE
+    )
+
+
+def dashboard_stats(db: Session, current_user: Principal) -> dict:
+    """Compute the dashboard figures for a user in one query.
+
+    Admins and Managers see every project and task, Developers only the
+    projects they are a member of and the tasks inside them. Status totals
+    are summed from the project_task_counters table; only the time dependent
+    overdue count and the user's own tasks are counted from tasks.
+    """
+    now = datetime.now(timezone.utc)
+    counter = models.ProjectTaskCounter
+    project_count = select(func.count(models.Project.id))
+    overdue = select(func.count(models.Task.id)).where(overdue_condition(now))
+    counter_scope = []
+    if current_user.role not in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
+        member_projects = member_project_ids(current_user.id)
+        project_count = project_count.where(models.Project.id.in_(member_projects))
+        overdue = overdue.where(models.Task.project_id.in_(member_projects))
+        counter_scope.append(counter.project_id.in_(member_projects))
+    my_tasks = select(func.count(models.Task.id)).where(models.Task.assignee_id == current_user.id)
+
+    stmt = select(
+        project_count.scalar_subquery().label("total_projects"),
+        func.coalesce(func.sum(counter.total_count), 0).label("total_tasks"),
+        *[
+            func.coalesce(func.sum(getattr(counter, column)), 0).label(task_status.name)
+            for task_status, column in counters.STATUS_COLUMNS.items()
+        ],
+        overdue.scalar_subquery().label("overdue_tasks"),
+        my_tasks.scalar_subquery().label("my_tasks")
+    ).select_from(counter).where(*counter_scope)
+
+    row = db.execute(stmt).one()
+    return {
+        "total_projects": row.total_projects,
+        "total_tasks": row.total_tasks,
+        "tasks_by_status": {task_status.value: row._mapping[task_status.name] for task_status in models.TaskStatus},
+        "overdue_tasks": row.overdue_tasks,
+        "my_tasks": row.my_tasks
+    }
+
+
+def project_stats(
+    db: Session,
+    current_user: Principal,
+    project_id: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> List[dict]:
+    """Per-project task statistics in one query.
+
+    Status totals are primary-key reads from project_task_counters; overdue
+    tasks are counted per project in SQL. Memory use does not depend on how
+    many tasks a project has. Rows are ordered by project id for stable paging.
+    """
+    now = datetime.now(timezone.utc)
+    counter = models.ProjectTaskCounter
+    overdue = select(
+        models.Task.project_id,
+        func.count(models.Task.id).label("overdue_tasks")
+    ).where(overdue_condition(now)).group_by(models.Task.project_id)
+    if project_id is not None:
+        overdue = overdue.where(models.Task.project_id == project_id)
+    overdue = overdue.subquery()
+
+    stmt = select(
+        models.Project.id,
+        models.Project.name,
+        func.coalesce(counter.total_count, 0).label("total_tasks"),
+        func.coalesce(counter.done_count, 0).label("completed_tasks"),
+        func.coalesce(counter.in_progress_count, 0).label("in_progress_tasks"),
+        func.coalesce(counter.todo_count, 0).label("todo_tasks"),
+        func.coalesce(overdue.c.overdue_tasks, 0).label("overdue_tasks")
+    ).outerjoin(
+        counter, counter.project_id == models.Project.id
+    ).outerjoin(
+        overdue, overdue.c.project_id == models.Project.id
+    ).order_by(models.Project.id)
+
+    if project_id is not None:
+        stmt = stmt.where(models.Project.id == project_id)
+    if current_user.role not in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
+        stmt = stmt.where(models.Project.id.in_(member_project_ids(current_user.id)))
+    if skip:
+        stmt = stmt.offset(skip)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    return [_project_stats_row(row) for row in db.execute(stmt)]
+
+
+def _project_stats_row(row) -> dict:
+    completion_percentage = (row.completed_tasks / row.total_tasks * 100) if row.total_tasks > 0 else 0
+    return {
+        "project_id": row.id,
+        "project_name": row.name,
+        "total_tasks": row.total_tasks,
+        "completed_tasks": row.completed_tasks,
+        "in_progress_tasks": row.in_progress_tasks,
+        "todo_tasks": row.todo_tasks,
+        "overdue_tasks": row.overdue_tasks,
+        "completion_percentage": round(completion_percentage, 2)
+    }
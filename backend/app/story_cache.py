@@ -0,0 +1,94 @@
+"""
+Content-addressed cache of generated user stories.
+
+Entries are keyed by a SHA-256 of the normalized project description, the
+model and the prompt version, so re-running the same (or the same modulo
+whitespace and case) description returns the earlier stories instead of
+paying for another completion, while a model or prompt change misses.
+
+Lookups go to an in-memory LRU first, then to an optional SQLite file
+(STORY_CACHE_PATH) that survives restarts and can be shared by the workers
+of one host. Both tiers expire entries after STORY_CACHE_TTL seconds.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from .cache import TTLCache
+from .config import settings
+from . import metrics
+
+memory_tier = TTLCache("story", maxsize=settings.STORY_CACHE_SIZE, ttl=settings.STORY_CACHE_TTL)
+disk_hits = metrics.counter("story_cache_disk_hits_total", "Stories served from the SQLite tier")
+disk_misses = metrics.counter("story_cache_disk_misses_total", "Lookups that missed the SQLite tier too")
+
+
+def _hit_rate() -> float:
+    lookups = memory_tier.hits.value + memory_tier.misses.value
+    return round((memory_tier.hits.value + disk_hits.value) / lookups, 4) if lookups else 0.0
+
+
+metrics.gauge("story_cache_hit_rate", "Share of story lookups served by either tier", _hit_rate)
+
+
+def normalize(description: str) -> str:
+    return " ".join(description.split()).casefold()
+
+
+def cache_key(description: str, model: str, prompt_version: int) -> str:
+    raw = json.dumps([prompt_version, model, normalize(description)], separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SQLiteTier:
+    """Stories in a local SQLite file, one row per key with an absolute expiry"""
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS story_cache (key TEXT PRIMARY KEY, stories TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stories FROM story_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, stories: List[str]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO story_cache (key, stories, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(stories), now + self.ttl)
+            )
+            self._conn.execute("DELETE FROM story_cache WHERE expires_at <= ?", (now,))
+
+
+disk_tier = SQLiteTier(settings.STORY_CACHE_PATH, settings.STORY_CACHE_TTL) if settings.STORY_CACHE_PATH else None
+
+
+async def get(key: str) -> Optional[List[str]]:
+    stories = memory_tier.get(key)
+    if stories is not None or disk_tier is None:
+        return stories
+    stories = await run_in_threadpool(disk_tier.get, key)
+    if stories is None:
+        disk_misses.inc()
+        return None
+    disk_hits.inc()
+    memory_tier.set(key, stories)
+    return stories
+
+
+async def put(key: str, stories: List[str]):
+    memory_tier.set(key, stories)
+    if disk_tier is not None:
+        await run_in_threadpool(disk_tier.set, key, stories)
@@ -0,0 +1,221 @@
+"""
+Streaming import of tasks into a project from NDJSON or CSV.
+
+The request body is parsed as it arrives: bytes are decoded incrementally,
+split into records and each record is validated against schemas.TaskCreate.
+CSV records may span lines inside quoted fields, up to MAX_RECORD_LINES
+lines. A record longer than MAX_RECORD_SIZE characters is reported as a
+failed row and dropped as it arrives. Assignees are given by
+`assignee` (username) or `assignee_id` and resolved through a map of all
+users read once up front. Valid rows are inserted and counted in
+transactions of BATCH_SIZE rows while the upload continues, so memory use
+does not depend on the size of the file. Rows that fail are reported by
+number and skipped; batches already committed stay committed.
+
+Database work goes through async_routes.run_db so the event loop is free
+to keep receiving the body.
+"""
+import codecs
+import csv
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from . import models, schemas, counters, bulk, search
+from .async_routes import run_db
+
+# Rows inserted per transaction
+BATCH_SIZE = 1000
+# Failed rows listed in the report; the rest are only counted
+MAX_ERRORS = 1000
+
+CSV_NULLS = {"", "null", "NULL"}
+# Limits of one record (a line, or the lines of a CSV record), so a file
+# without line breaks or with an unterminated quote is never held in memory
+MAX_RECORD_LINES = 1000
+MAX_RECORD_SIZE = 1024 * 1024
+
+
+def oversized() -> ValueError:
+    return ValueError(f"Row is longer than {MAX_RECORD_SIZE} characters")
+
+
+async def lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """Decoded lines of a byte stream without the \n; a \r before it is kept for CSV fields
+
+    A line longer than MAX_RECORD_SIZE is yielded as None once and the rest
+    of it is dropped as it arrives instead of being buffered.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    rest = ""
+    skipping = False
+    async for chunk in stream:
+        text = rest + decoder.decode(chunk)
+        *complete, rest = text.split("\n")
+        for line in complete:
+            if skipping:
+                # The end of the oversized line
+                skipping = False
+                continue
+            yield line if len(line) <= MAX_RECORD_SIZE else None
+        if len(rest) > MAX_RECORD_SIZE:
+            if not skipping:
+                yield None
+            skipping = True
+            rest = ""
+    rest += decoder.decode(b"", final=True)
+    if rest and not skipping:
+        yield rest if len(rest) <= MAX_RECORD_SIZE else None
+
+
+async def ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """(row number, parsed object or the parse error) for each non-empty line"""
+    number = 0
+    async for line in lines(stream):
+        if line is None:
+            number += 1
+            yield number, oversized()
+            continue
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield number, e
+
+
+def ends_quoted(line: str, quoted: bool) -> bool:
+    """Whether a CSV record is inside a quoted field after line, following csv.reader's rules"""
+    state = "quoted" if quoted else "start"
+    for char in line:
+        if state == "quoted":
+            if char == '"':
+                state = "closing"
+        elif state == "closing" and char == '"':
+            # A doubled quote inside a quoted field
+            state = "quoted"
+        elif char == ",":
+            state = "start"
+        elif state == "start" and char == '"':
+            state = "quoted"
+        else:
+            state = "field"
+    return state == "quoted"
+
+
+async def csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """(row number, dict by header column) for each CSV record after the header"""
+    header: Optional[List[str]] = None
+    number = 0
+    record: List[str] = []
+    size = 0
+    quoted = False
+    async for line in lines(stream):
+        if line is None:
+            # Also drops the lines of a quoted field it was part of
+            number += 1
+            yield number, oversized()
+            record, size, quoted = [], 0, False
+            continue
+        # A quoted field may continue on the next line; only a quote opening a field starts one
+        quoted = ends_quoted(line, quoted)
+        record.append(line)
+        size += len(line)
+        if quoted:
+            if len(record) < MAX_RECORD_LINES and size < MAX_RECORD_SIZE:
+                continue
+            number += 1
+            yield number, ValueError("Quoted field is too long or not terminated")
+            record, size, quoted = [], 0, False
+            continue
+        values = next(csv.reader(["\n".join(record).removesuffix("\r")]), [])
+        record, size = [], 0
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        number += 1
+        yield number, {
+            name: (None if value in CSV_NULLS else value) for name, value in zip(header, values)
+        }
+    if record:
+        yield number + 1, ValueError("Unterminated quoted field")
+
+
+class Importer:
+    """Validates records for one project and writes them in batches"""
+
+    def __init__(self, project_id: int, creator_id: int, user_ids: Dict[str, int]):
+        self.project_id = project_id
+        self.creator_id = creator_id
+        self.user_ids = user_ids
+        self.known_ids: Set[int] = set(user_ids.values())
+        self.pending: List[dict] = []
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[schemas.TaskImportError] = []
+
+    @classmethod
+    def load(cls, db: Session, project_id: int, creator_id: int) -> "Importer":
+        user_ids = dict(db.execute(select(models.User.username, models.User.id)).all())
+        return cls(project_id, creator_id, user_ids)
+
+    def add(self, number: int, record: object):
+        """Validate a parsed record and queue it, or note why it was rejected"""
+        if isinstance(record, Exception):
+            return self.reject(number, f"Could not parse row: {record}")
+        if not isinstance(record, dict):
+            return self.reject(number, "Expected an object")
+        data = {key: value for key, value in record.items() if key not in ("id", "project_id", "assignee")}
+        username = record.get("assignee")
+        if username is not None:
+            if username not in self.user_ids:
+                return self.reject(number, f"Unknown assignee: {username}")
+            data["assignee_id"] = self.user_ids[username]
+        try:
+            task = schemas.TaskCreate(**data, project_id=self.project_id)
+        except ValidationError as e:
+            return self.reject(number, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+        if task.assignee_id is not None and task.assignee_id not in self.known_ids:
+            return self.reject(number, f"Unknown assignee_id: {task.assignee_id}")
+        self.pending.append({**task.model_dump(), "creator_id": self.creator_id})
+
+    def reject(self, number: int, detail: str):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(schemas.TaskImportError(row=number, detail=detail))
+
+    def write(self, db: Session):
+        """Insert and count the queued rows in one transaction"""
+        rows, self.pending = self.pending, []
+        task_ids = bulk.insert_many(db, models.Task, rows)
+        counters.tasks_added(db, [(row["project_id"], row["status"]) for row in rows])
+        search.index_tasks(db, task_ids)
+        db.commit()
+        self.imported += len(rows)
+
+    def result(self) -> schemas.TaskImportResult:
+        return schemas.TaskImportResult(imported=self.imported, failed=self.failed, errors=self.errors)
+
+
+async def import_tasks(
+    db: Session,
+    stream: AsyncIterator[bytes],
+    import_format: str,
+    project_id: int,
+    creator_id: int
+) -> schemas.TaskImportResult:
+    importer = await run_db(db, lambda session: Importer.load(session, project_id, creator_id))
+    records = csv_records(stream) if import_format == "csv" else ndjson_records(stream)
+    async for number, record in records:
+        importer.add(number, record)
+        if len(importer.pending) >= BATCH_SIZE:
+            await run_db(db, importer.write)
+    if importer.pending:
+        await run_db(db, importer.write)
+    return importer.result()
@@ -0,0 +1,74 @@
+"""
+User story generation under concurrency: a new blocking Groq client per call
+in a 40-thread pool (the previous behaviour) versus the shared AsyncGroq
+client, both against the local fake Groq server.
+
+    python -m benchmarks.bench_ai_client --requests 200 --latency 1
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .common import report
+from groq import Groq
+from app import groq_client
+from app.config import settings
+from app.routers import ai
+from tests.fake_groq import run_fake_groq
+
+# Starlette's default threadpool size
+THREADPOOL_SIZE = 40
+
+
+def per_call_client(timings):
+    start = time.perf_counter()
+    client = Groq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL)
+    client.chat.completions.create(
+        messages=[{"role": "user", "content": "A project tool"}],
+        model=settings.GROQ_MODEL
+    )
+    timings.append((time.perf_counter() - start) * 1000)
+
+
+async def shared_client(timings):
+    start = time.perf_counter()
+    await ai.generate_user_stories_with_groq("A project tool")
+    timings.append((time.perf_counter() - start) * 1000)
+
+
+async def run_shared(requests: int, timings):
+    await asyncio.gather(*[shared_client(timings) for _ in range(requests)])
+    await groq_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200, help="concurrent generate calls")
+    parser.add_argument("--latency", type=float, default=1.0, help="fake completion latency in seconds")
+    args = parser.parse_args()
+
+    with run_fake_groq(latency=args.latency) as (base_url, fake):
+        settings.GROQ_BASE_URL = base_url
+        settings.GROQ_API_KEY = "benchmark-key"
+        settings.GROQ_MAX_CONNECTIONS = args.requests
+
+        timings = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=THREADPOOL_SIZE) as pool:
+            for _ in range(args.requests):
+                pool.submit(per_call_client, timings)
+        elapsed = time.perf_counter() - start
+        report(f"client per call / {fake.requests} requests", timings)
+        print(f"{'':<40} wall {elapsed:6.2f} s   connections {len(fake.connections)}")
+
+        fake.requests, fake.connections = 0, set()
+        timings = []
+        start = time.perf_counter()
+        asyncio.run(run_shared(args.requests, timings))
+        elapsed = time.perf_counter() - start
+        report(f"shared async client / {fake.requests} requests", timings)
+        print(f"{'':<40} wall {elapsed:6.2f} s   connections {len(fake.connections)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Time to first user story: the full completion versus the streamed one,
+against the local fake Groq server.
+
+    python -m benchmarks.bench_ai_stream --latency 3 --repeat 5
+"""
+import argparse
+import asyncio
+import time
+from .common import report
+from app import groq_client
+from app.config import settings
+from app.routers import ai
+from tests.fake_groq import run_fake_groq
+
+
+async def measure(repeat: int):
+    full, first, last = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await ai.generate_user_stories_with_groq("A project tool")
+        full.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        async for _story in ai.stream_user_stories_with_groq("A project tool"):
+            if len(first) < len(full):
+                first.append((time.perf_counter() - start) * 1000)
+        last.append((time.perf_counter() - start) * 1000)
+    await groq_client.close()
+    return full, first, last
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=3.0, help="fake completion latency in seconds")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with run_fake_groq(latency=args.latency) as (base_url, fake):
+        settings.GROQ_BASE_URL = base_url
+        settings.GROQ_API_KEY = "benchmark-key"
+        full, first, last = asyncio.run(measure(args.repeat))
+
+    report("full completion, all stories", full)
+    report("streamed, first story", first)
+    report("streamed, last story", last)
+
+
+if __name__ == "__main__":
+    main()
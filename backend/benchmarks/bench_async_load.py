@@ -0,0 +1,100 @@
+"""
+Load test of the sync (threadpool) and async (ASYNC_DB) request paths.
+
+    python -m benchmarks.bench_async_load --clients 500 --requests-per-client 20
+
+Each mode runs in its own process so ASYNC_DB is picked up at import time.
+By default the app is driven in-process through httpx's ASGI transport; pass
+--base-url to load an already running uvicorn server instead (start it with
+ASYNC_DB=true/false and compare the two runs). Use --database-url with a
+PostgreSQL URL for numbers representative of production; SQLite serializes
+writers and has no network round trips to overlap.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from .common import make_parser, make_session_factory, seed, report
+
+ENDPOINTS = ["/api/tasks/?limit=20", "/api/dashboard/stats"]
+
+
+async def run_load(base_url: str, transport, token: str, clients: int, requests_per_client: int):
+    import httpx
+
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=120) as client:
+        async def client_loop(number: int):
+            nonlocal errors
+            for i in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.get(
+                    ENDPOINTS[(number + i) % len(ENDPOINTS)],
+                    headers={"Authorization": f"Bearer {token}"}
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(number) for number in range(clients)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def run_mode(args):
+    """Child process: drive the app configured by the environment"""
+    import httpx
+    from app import auth
+
+    transport = None
+    base_url = args.base_url
+    if base_url is None:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        base_url = "http://benchmark"
+    token = auth.create_access_token({"sub": "1"})
+    latencies, errors, elapsed = asyncio.run(
+        run_load(base_url, transport, token, args.clients, args.requests_per_client)
+    )
+    label = "async" if os.environ.get("ASYNC_DB", "").lower() == "true" else "sync"
+    report(f"{label} / {args.clients} clients", latencies)
+    print(f"{'':<40} throughput {len(latencies) / elapsed:9.1f} req/s   errors {errors}")
+
+
+def main():
+    parser = make_parser(__doc__, tasks=100_000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--mode", choices=["sync", "async"], default=None, help=argparse_hidden())
+    args = parser.parse_args()
+
+    if args.mode:
+        return run_mode(args)
+
+    engine, _ = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+    engine.dispose()
+    for mode in ["sync", "async"]:
+        env = dict(
+            os.environ,
+            DATABASE_URL=args.database_url,
+            ASYNC_DB="true" if mode == "async" else "false",
+            DB_POOL_MODE=os.environ.get("DB_POOL_MODE", "queue"),
+            # Enough connections for every client, so the runs compare the
+            # request path rather than pool timeouts
+            DB_MAX_OVERFLOW=os.environ.get("DB_MAX_OVERFLOW", str(args.clients)),
+        )
+        subprocess.run([sys.executable, "-m", __spec__.name, *sys.argv[1:], "--mode", mode], env=env, check=True)
+
+
+def argparse_hidden():
+    import argparse
+    return argparse.SUPPRESS
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Per-request cost of the auth dependency: JWT verification and principal load.
+
+    python -m benchmarks.bench_auth --repeat 5000
+
+Each JWT backend that is installed is measured cold (verify and query every
+time), with the verified-token cache only, and with both caches warm.
+"""
+from .common import make_parser, make_session_factory, seed, timed, report
+from app import auth
+from app.jwt_backends import BACKENDS, get_backend
+
+
+def main():
+    parser = make_parser(__doc__, tasks=1_000)
+    parser.set_defaults(projects=10, users=10, repeat=5_000)
+    args = parser.parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+
+    with SessionLocal() as db:
+        for name in BACKENDS:
+            try:
+                auth.jwt_backend = get_backend(name)
+            except RuntimeError as e:
+                print(f"{name}: skipped, {e}")
+                continue
+            token = auth.create_access_token({"sub": "1"})
+
+            def cold():
+                auth.token_cache.clear()
+                auth.principal_cache.clear()
+                return auth.get_current_principal(token, db)
+
+            def token_cached():
+                auth.principal_cache.clear()
+                return auth.get_current_principal(token, db)
+
+            def warm():
+                return auth.get_current_principal(token, db)
+
+            report(f"{name} / verify + query", timed(cold, args.repeat))
+            report(f"{name} / token cached + query", timed(token_cached, args.repeat))
+            report(f"{name} / both cached", timed(warm, args.repeat))
+            auth.token_cache.clear()
+            auth.principal_cache.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Task creation throughput: one INSERT + commit + refresh per task (what
+POST /api/tasks/ does) versus the bulk writer, directly and through
+POST /api/tasks/bulk.
+
+    python -m benchmarks.bench_bulk_insert --rows 10000
+"""
+import time
+from .common import make_parser, make_session_factory, seed, count_round_trips
+from fastapi.testclient import TestClient
+from app import auth, bulk, counters, models
+from app.database import get_db
+from app.main import app
+
+
+def task_rows(count: int, project_id: int = 1):
+    return [
+        {"title": f"Bulk task {i}", "description": "Created by the benchmark", "status": models.TaskStatus.TODO,
+         "priority": "Medium", "deadline": None, "project_id": project_id, "assignee_id": (i % 10) + 1, "creator_id": 1}
+        for i in range(count)
+    ]
+
+
+def report_rate(label: str, rows: int, seconds: float, round_trips: int):
+    print(f"{label:<40} {rows / seconds:10.0f} rows/s   {seconds:7.2f} s   round trips {round_trips}")
+
+
+def main():
+    parser = make_parser(__doc__, tasks=1_000)
+    parser.set_defaults(projects=10, users=10)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--per-row-rows", type=int, default=1_000, help="rows for the slow per-row variant")
+    args = parser.parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+
+    with SessionLocal() as db, count_round_trips(engine) as statements:
+        start = time.perf_counter()
+        for row in task_rows(args.per_row_rows):
+            task = models.Task(**row)
+            db.add(task)
+            counters.task_added(db, task.project_id, task.status)
+            db.commit()
+            db.refresh(task)
+        report_rate("per task commit + refresh", args.per_row_rows, time.perf_counter() - start, len(statements))
+
+    with SessionLocal() as db, count_round_trips(engine) as statements:
+        start = time.perf_counter()
+        created = bulk.insert_returning(db, models.Task, task_rows(args.rows))
+        counters.tasks_added(db, [(task.project_id, task.status) for task in created])
+        db.commit()
+        report_rate("bulk.insert_returning", args.rows, time.perf_counter() - start, len(statements))
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': '1'})}"}
+    payload = {"tasks": [
+        {key: (value.value if isinstance(value, models.TaskStatus) else value) for key, value in row.items() if key != "creator_id"}
+        for row in task_rows(args.rows)
+    ]}
+    with count_round_trips(engine) as statements:
+        start = time.perf_counter()
+        response = client.post("/api/tasks/bulk", json=payload, headers=headers)
+        assert response.status_code == 201, response.text
+        report_rate("POST /api/tasks/bulk", args.rows, time.perf_counter() - start, len(statements))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Dashboard statistics: per-status COUNT queries versus the single aggregate query.
+
+    python -m benchmarks.bench_dashboard_stats --tasks 1000000
+"""
+from datetime import datetime, timezone
+from .common import make_parser, make_session_factory, seed, count_round_trips, timed, report
+from sqlalchemy import func
+from app import models, stats
+
+
+def legacy_dashboard_stats(db, current_user):
+    """The dashboard implementation before the aggregate query, kept for comparison"""
+    if current_user.role in [models.UserRole.ADMIN, models.UserRole.MANAGER]:
+        total_projects = db.query(func.count(models.Project.id)).scalar()
+        total_tasks = db.query(func.count(models.Task.id)).scalar()
+    else:
+        total_projects = db.query(func.count(models.Project.id)).join(
+            models.project_members
+        ).filter(models.project_members.c.user_id == current_user.id).scalar()
+        total_tasks = db.query(func.count(models.Task.id)).join(
+            models.Project
+        ).join(models.project_members).filter(
+            models.project_members.c.user_id == current_user.id
+        ).scalar()
+    tasks_by_status = {}
+    for task_status in models.TaskStatus:
+        tasks_by_status[task_status.value] = db.query(func.count(models.Task.id)).filter(
+            models.Task.status == task_status
+        ).scalar()
+    now = datetime.now(timezone.utc)
+    overdue_tasks = db.query(func.count(models.Task.id)).filter(
+        models.Task.deadline < now,
+        models.Task.status != models.TaskStatus.DONE
+    ).scalar()
+    my_tasks = db.query(func.count(models.Task.id)).filter(
+        models.Task.assignee_id == current_user.id
+    ).scalar()
+    return {
+        "total_projects": total_projects,
+        "total_tasks": total_tasks,
+        "tasks_by_status": tasks_by_status,
+        "overdue_tasks": overdue_tasks,
+        "my_tasks": my_tasks
+    }
+
+
+def main():
+    args = make_parser(__doc__).parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+
+    with SessionLocal() as db:
+        users = {
+            role: db.query(models.User).filter(models.User.role == role).first()
+            for role in [models.UserRole.ADMIN, models.UserRole.DEVELOPER]
+        }
+        for role, user in users.items():
+            for label, fn in [("legacy", legacy_dashboard_stats), ("aggregate", stats.dashboard_stats)]:
+                with count_round_trips(engine) as statements:
+                    fn(db, user)
+                samples = timed(lambda: fn(db, user), args.repeat)
+                report(f"{role.value} / {label}", samples, len(statements))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Export throughput and memory: every task of one project streamed as NDJSON
+and CSV, with and without comments, against paging through the ORM the way
+a client of GET /api/tasks/?project_id= does.
+
+    python -m benchmarks.bench_export --tasks 1000000 --comments 200000
+
+All tasks are seeded into a single project. Peak RSS is printed after each
+variant; it only grows, so run the variants alone (--variants) to compare
+their peaks.
+"""
+import random
+import resource
+import sys
+import time
+from sqlalchemy import func, insert, select
+from .common import make_parser, make_session_factory, seed
+from app import export, models, schemas
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed_comments(engine, count: int, tasks: int, batch_size: int = 50_000):
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count(models.Comment.id))).scalar()
+    if existing >= count:
+        return
+    rng = random.Random(7)
+    print(f"Seeding {count - existing} comments...")
+    for start in range(existing, count, batch_size):
+        with engine.begin() as conn:
+            conn.execute(insert(models.Comment), [
+                {"content": "Benchmark comment", "task_id": rng.randint(1, tasks), "author_id": 1}
+                for _ in range(start, min(start + batch_size, count))
+            ])
+
+
+def orm_pages(SessionLocal, project_id: int, page_size: int = 100):
+    """What a client paging the task list costs the server, page by page"""
+    last_id = 0
+    while True:
+        with SessionLocal() as db:
+            tasks = db.query(models.Task).filter(
+                models.Task.project_id == project_id, models.Task.id > last_id
+            ).order_by(models.Task.id).limit(page_size).all()
+            if not tasks:
+                return
+            page = [schemas.TaskResponse.model_validate(task).model_dump_json() for task in tasks]
+            last_id = tasks[-1].id
+            yield ("[" + ",".join(page) + "]").encode("utf-8")
+
+
+def main():
+    parser = make_parser(__doc__, tasks=1_000_000)
+    parser.set_defaults(projects=1)
+    parser.add_argument("--comments", type=int, default=100_000, help="number of seeded comments")
+    parser.add_argument("--variants", nargs="+", default=["ndjson", "ndjson+comments", "csv", "csv+comments", "orm-pages"])
+    args = parser.parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+    seed_comments(engine, args.comments, args.tasks)
+    # Stream from the benchmark database rather than the app's DATABASE_URL
+    export.SessionLocal = SessionLocal
+
+    for variant in args.variants:
+        if variant == "orm-pages":
+            chunks = orm_pages(SessionLocal, 1)
+        else:
+            export_format, _, comments = variant.partition("+")
+            chunks = export.chunks(export_format, 1, bool(comments))
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in chunks)
+        seconds = time.perf_counter() - start
+        print(
+            f"{variant:<20} {args.tasks / seconds:10.0f} rows/s   {size / seconds / 1e6:7.1f} MB/s   "
+            f"{seconds:7.2f} s   {size / 1e6:8.1f} MB   peak RSS {peak_rss_mb():7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
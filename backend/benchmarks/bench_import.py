@@ -0,0 +1,98 @@
+"""
+Import throughput and memory: a generated NDJSON or CSV file streamed to
+POST /api/projects/{id}/import on a local uvicorn server.
+
+    python -m benchmarks.bench_import --rows 500000 --format csv
+
+The client streams the file from disk, so the peak RSS printed at the end
+(client and server share the process) reflects the server's buffering.
+"""
+import csv
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import httpx
+import uvicorn
+from .common import make_parser, make_session_factory, seed
+from app import auth
+from app.database import get_db
+from app.main import app
+
+
+def write_file(path: str, rows: int, users: int, file_format: str):
+    rng = random.Random(3)
+    statuses = ["To Do", "In Progress", "Done"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f) if file_format == "csv" else None
+        if writer:
+            writer.writerow(["title", "description", "status", "priority", "assignee"])
+        for i in range(rows):
+            row = [f"Imported {i}", "Migrated from the old tracker", rng.choice(statuses),
+                   rng.choice(["Low", "Medium", "High"]), f"bench{rng.randint(1, users)}"]
+            if writer:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(["title", "description", "status", "priority", "assignee"], row))) + "\n")
+
+
+def file_chunks(path: str, size: int = 64 * 1024):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = make_parser(__doc__, tasks=1_000)
+    parser.set_defaults(projects=10, users=50)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    args = parser.parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+
+    def override_get_db():
+        with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    # No lifespan: the background job worker is not needed here
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"tasks.{args.format}")
+        write_file(path, args.rows, args.users, args.format)
+        size = os.path.getsize(path)
+        print(f"Importing {args.rows} rows, {size / 1e6:.1f} MB of {args.format}, RSS before {peak_rss_mb():.1f} MB")
+        headers = {"Authorization": f"Bearer {auth.create_access_token({'sub': '1'})}"}
+        start = time.perf_counter()
+        response = httpx.post(
+            f"http://127.0.0.1:{port}/api/projects/1/import?format={args.format}",
+            content=file_chunks(path), headers=headers, timeout=None
+        )
+        seconds = time.perf_counter() - start
+    server.should_exit = True
+    thread.join()
+
+    result = response.json()
+    print(f"imported {result['imported']}, failed {result['failed']}")
+    print(f"{args.rows / seconds:10.0f} rows/s   {size / seconds / 1e6:7.1f} MB/s   {seconds:7.2f} s   peak RSS {peak_rss_mb():7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
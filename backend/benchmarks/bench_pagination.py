@@ -0,0 +1,44 @@
+"""
+Task list paging: OFFSET versus the keyset cursor at increasing page depth.
+
+    python -m benchmarks.bench_pagination --tasks 1000000 --page-size 100
+"""
+from .common import make_parser, make_session_factory, seed, timed, report
+from app import models, pagination
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000])
+    args = parser.parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+
+    limit = args.page_size
+    with SessionLocal() as db:
+        for page in args.pages:
+            skip = (page - 1) * limit
+            if skip >= args.tasks:
+                print(f"page {page} is beyond the seeded {args.tasks} tasks, skipping")
+                continue
+            # Cursor a client would hold after reading the previous page
+            after = None
+            if skip:
+                last_id = db.query(models.Task.id).order_by(models.Task.id).offset(skip - 1).limit(1).scalar()
+                after = pagination.encode_cursor(last_id)
+
+            def offset_page():
+                return pagination.paginate(db.query(models.Task), models.Task.id, None, skip, limit).all()
+
+            def keyset_page():
+                return pagination.paginate(db.query(models.Task), models.Task.id, after, 0, limit).all()
+
+            assert [task.id for task in offset_page()] == [task.id for task in keyset_page()]
+            report(f"page {page:>6} / offset", timed(offset_page, args.repeat))
+            report(f"page {page:>6} / keyset", timed(keyset_page, args.repeat))
+            db.expunge_all()
+
+
+if __name__ == "__main__":
+    main()
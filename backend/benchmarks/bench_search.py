@@ -0,0 +1,68 @@
+"""
+Search latency over a generated corpus: the inverted index behind
+/api/search against a LIKE '%word%' scan, for common, rare and multi-word
+queries, as an Admin and as a Developer (visibility filter applied).
+
+    python -m benchmarks.bench_search --tasks 1000000
+
+Every seeded task gets a search document with a title and body drawn from a
+Zipf-like vocabulary, so common words match many documents and rare words
+a handful.
+"""
+import random
+from sqlalchemy import func, insert, or_, select
+from .common import make_parser, make_session_factory, seed, timed, report
+from app import auth, models, search
+
+VOCABULARY = [f"word{i}" for i in range(20_000)]
+
+
+def pick_words(rng: random.Random, count: int):
+    # Low indexes are far more frequent than high ones
+    return " ".join(VOCABULARY[min(int(rng.paretovariate(1.0)) - 1, len(VOCABULARY) - 1)] for _ in range(count))
+
+
+def seed_documents(engine, tasks: int, projects: int, batch_size: int = 20_000):
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count(models.SearchDocument.id))).scalar()
+    if existing >= tasks:
+        return
+    rng = random.Random(11)
+    print(f"Indexing {tasks} documents...")
+    for start in range(existing, tasks, batch_size):
+        with engine.begin() as conn:
+            conn.execute(insert(models.SearchDocument), [
+                {"kind": "task", "object_id": task_id, "project_id": rng.randint(1, projects), "task_id": task_id,
+                 "title": pick_words(rng, 4), "body": pick_words(rng, 30)}
+                for task_id in range(start + 1, min(start + batch_size, tasks) + 1)
+            ])
+    print("Indexing done")
+
+
+def like_search(db, q: str, limit: int = 20):
+    doc = models.SearchDocument
+    conditions = [or_(doc.title.like(f"%{word}%"), doc.body.like(f"%{word}%")) for word in search.terms(q)]
+    return db.execute(select(doc.id).where(*conditions).order_by(doc.id).limit(limit)).all()
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument("--queries", nargs="+", default=["word1", "word5000", "word2 word3", "word123", "word19999"])
+    args = parser.parse_args()
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+    seed_documents(engine, args.tasks, args.projects)
+
+    admin = auth.Principal(id=1, role=models.UserRole.ADMIN, username="bench1")
+    developer = auth.Principal(id=3, role=models.UserRole.DEVELOPER, username="bench3")
+    with SessionLocal() as db:
+        for q in args.queries:
+            matches = len(search.search(db, admin, q, limit=100))
+            print(f"\n'{q}' ({matches} of the top 100)")
+            report("index, Admin", timed(lambda: search.search(db, admin, q), args.repeat))
+            report("index, Developer", timed(lambda: search.search(db, developer, q), args.repeat))
+            report("LIKE scan", timed(lambda: like_search(db, q), max(1, args.repeat // 10)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Response serialization cost.
+
+Per schema in app/schemas.py: FastAPI's default path (validate every item
+against the response model, dump to JSON-ready values, json.dumps) versus
+orjson encoding the same trusted data. Then a 100-task page end to end: ORM
+objects with lazy-loaded assignees through TaskResponse, versus the column
+rows and dicts of serialization.RowPlan.
+
+    python -m benchmarks.bench_serialization --items 100 --tasks 100000
+"""
+import enum
+import inspect
+import json
+import typing
+from datetime import date, datetime, timezone
+from typing import List
+from pydantic import BaseModel, TypeAdapter
+from .common import make_parser, make_session_factory, seed, timed, report, count_round_trips
+from app import models, schemas, serialization
+from app.routers.tasks import TASK_ROWS
+
+
+def sample_value(annotation, name: str):
+    """A plausible value for a field annotation"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        return sample_value(next(arg for arg in typing.get_args(annotation) if arg is not type(None)), name)
+    if origin in (list, List):
+        return [sample_value(typing.get_args(annotation)[0], name) for _ in range(3)]
+    if origin is dict:
+        return {"key": "value"}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return sample(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return list(annotation)[0]
+    if annotation is int:
+        return 42
+    if annotation is float:
+        return 4.2
+    if annotation is bool:
+        return True
+    if annotation is datetime:
+        return datetime(2030, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    if annotation is date:
+        return date(2030, 1, 2)
+    if "email" in name:
+        return "bench@example.com"
+    return f"Sample {name}"
+
+
+def sample(schema) -> dict:
+    return {name: sample_value(field.annotation, name) for name, field in schema.model_fields.items()}
+
+
+def response_schemas():
+    return [
+        schema for _, schema in inspect.getmembers(schemas, inspect.isclass)
+        if issubclass(schema, BaseModel) and schema.__module__ == schemas.__name__
+    ]
+
+
+def bench_schemas(items: int, repeat: int):
+    print(f"Lists of {items} items, per schema")
+    for schema in response_schemas():
+        try:
+            data = [sample(schema) for _ in range(items)]
+            adapter = TypeAdapter(List[schema])
+            adapter.validate_python(data)
+        except Exception as e:
+            print(f"{schema.__name__:<40} skipped: {type(e).__name__}")
+            continue
+
+        def default_path():
+            return json.dumps(adapter.dump_python(adapter.validate_python(data), mode="json")).encode("utf-8")
+
+        def trusted_path():
+            return serialization.JSONResponse(data).body
+
+        assert json.loads(default_path()) == json.loads(trusted_path()), schema.__name__
+        report(f"{schema.__name__} / validate + json", timed(default_path, repeat))
+        report(f"{schema.__name__} / orjson", timed(trusted_path, repeat))
+
+
+def bench_task_page(SessionLocal, engine, page_size: int, repeat: int):
+    print(f"\n{page_size}-task page")
+    adapter = TypeAdapter(List[schemas.TaskResponse])
+
+    def orm_page():
+        with SessionLocal() as db:
+            tasks = db.query(models.Task).order_by(models.Task.id).limit(page_size).all()
+            return json.dumps(adapter.dump_python(adapter.validate_python(tasks, from_attributes=True), mode="json"))
+
+    def row_page():
+        with SessionLocal() as db:
+            rows = TASK_ROWS.apply(db.query(models.Task)).order_by(models.Task.id).limit(page_size).all()
+            return serialization.JSONResponse(TASK_ROWS.to_dicts(rows)).body
+
+    assert json.loads(orm_page()) == json.loads(row_page())
+    for label, fn in [("ORM + TaskResponse validation", orm_page), ("RowPlan rows + orjson", row_page)]:
+        with count_round_trips(engine) as statements:
+            fn()
+        report(label, timed(fn, repeat), len(statements))
+
+
+def main():
+    parser = make_parser(__doc__, tasks=100_000)
+    parser.set_defaults(projects=100)
+    parser.add_argument("--items", type=int, default=100, help="list length for the per-schema runs")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    bench_schemas(args.items, args.repeat)
+
+    engine, SessionLocal = make_session_factory(args.database_url)
+    seed(engine, args.users, args.projects, args.tasks)
+    bench_task_page(SessionLocal, engine, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the backend directory as modules, for example:
+
+    python -m benchmarks.bench_dashboard_stats --tasks 1000000
+
+They default to a local SQLite file; pass --database-url to run against
+PostgreSQL. The seeded database is reused between runs when the row counts
+match, so only the first run pays for seeding.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+# Settings are read at import time, provide defaults so app modules import cleanly
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, event, insert, select, func
+from sqlalchemy.orm import Session, sessionmaker
+from app import models, counters
+from app.database import Base
+
+
+def make_parser(description: str, tasks: int = 1_000_000) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--database-url", default=os.environ["DATABASE_URL"])
+    parser.add_argument("--tasks", type=int, default=tasks, help="number of seeded tasks")
+    parser.add_argument("--projects", type=int, default=1_000, help="number of seeded projects")
+    parser.add_argument("--users", type=int, default=200, help="number of seeded users")
+    parser.add_argument("--repeat", type=int, default=20, help="timed iterations per variant")
+    return parser
+
+
+def make_session_factory(database_url: str):
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed(engine, users: int, projects: int, tasks: int, batch_size: int = 50_000, seed_value: int = 42):
+    """Fill the database with a deterministic data set unless it is already there"""
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count(models.Task.id))).scalar()
+    if existing == tasks:
+        return
+    if existing:
+        raise SystemExit(f"Database already holds {existing} tasks, use a fresh --database-url")
+
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+    statuses = list(models.TaskStatus)
+    roles = [models.UserRole.ADMIN, models.UserRole.MANAGER] + [models.UserRole.DEVELOPER] * 8
+    print(f"Seeding {users} users, {projects} projects and {tasks} tasks...")
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {
+                "email": f"bench{i}@example.com",
+                "username": f"bench{i}",
+                "full_name": f"Bench User {i}",
+                "hashed_password": "x",
+                "role": roles[i % len(roles)]
+            }
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(models.Project), [
+            {"name": f"Project {i}", "description": "Benchmark project", "creator_id": 1}
+            for i in range(1, projects + 1)
+        ])
+        conn.execute(insert(models.project_members), [
+            {"project_id": project_id, "user_id": user_id}
+            for project_id in range(1, projects + 1)
+            for user_id in rng.sample(range(1, users + 1), min(5, users))
+        ])
+    for start in range(0, tasks, batch_size):
+        rows = []
+        for _ in range(start, min(start + batch_size, tasks)):
+            deadline = now + timedelta(days=rng.randint(-60, 60)) if rng.random() < 0.7 else None
+            rows.append({
+                "title": f"Task {rng.getrandbits(32):08x}",
+                "description": "Benchmark task",
+                "status": rng.choice(statuses),
+                "priority": rng.choice(["Low", "Medium", "High"]),
+                "deadline": deadline,
+                "project_id": rng.randint(1, projects),
+                "assignee_id": rng.randint(1, users),
+                "creator_id": 1
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(models.Task), rows)
+    with Session(engine) as db:
+        counters.rebuild(db)
+        db.commit()
+    print("Seeding done")
+
+
+@contextmanager
+def count_round_trips(engine):
+    """Collect the statements sent to the database while the block runs"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def timed(fn, repeat: int):
+    """Run fn repeat times and return the per-call latencies in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples, round_trips=None):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    line = f"{label:<40} median {statistics.median(ordered):9.2f} ms   p95 {p95:9.2f} ms"
+    if round_trips is not None:
+        line += f"   round trips {round_trips}"
+    print(line)
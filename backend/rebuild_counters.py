@@ -0,0 +1,34 @@
+"""
+Rebuild or verify the project_task_counters table.
+
+    python rebuild_counters.py           # recompute every counter from tasks
+    python rebuild_counters.py --verify  # only report drift, exit 1 if any
+"""
+import argparse
+import sys
+from app.database import SessionLocal
+from app import counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify project task counters")
+    parser.add_argument("--verify", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drift = counters.rebuild(db, verify_only=args.verify)
+        for entry in drift:
+            print(f"project {entry['project_id']}: {entry['field']} stored={entry['stored']} actual={entry['actual']}")
+        if args.verify:
+            print(f"{len(drift)} drifted value(s) found")
+            return 1 if drift else 0
+        db.commit()
+        print(f"Counters rebuilt, {len(drift)} drifted value(s) corrected")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
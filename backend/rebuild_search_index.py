@@ -0,0 +1,24 @@
+"""
+Recreate the full-text search documents from tasks, comments, projects and
+user stories, e.g. after restoring a backup or changing what is indexed.
+
+    python rebuild_search_index.py
+"""
+import sys
+from app.database import SessionLocal
+from app import search
+
+
+def main():
+    db = SessionLocal()
+    try:
+        count = search.rebuild(db)
+        db.commit()
+        print(f"Search index rebuilt, {count} document(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
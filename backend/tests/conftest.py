@@ -0,0 +1,92 @@
+import os
+
+# Settings are read at import time, provide defaults so the suite runs without a .env
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+# Start every run from an empty test database
+if os.path.exists("./test.db"):
+    os.remove("./test.db")
+
+import itertools
+from contextlib import contextmanager
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import Base, get_db
+
+engine = create_engine("sqlite:///./test.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+_user_numbers = itertools.count(1)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a user with the given role and return (user, auth headers)"""
+    def _make_user(role="Developer"):
+        number = next(_user_numbers)
+        user = client.post(
+            "/api/auth/register",
+            json={
+                "email": f"user{number}@example.com",
+                "username": f"user{number}",
+                "full_name": f"User {number}",
+                "role": role,
+                "password": "testpass123"
+            }
+        ).json()
+        token = client.post(
+            "/api/auth/login",
+            data={"username": f"user{number}", "password": "testpass123"}
+        ).json()["access_token"]
+        return user, {"Authorization": f"Bearer {token}"}
+    return _make_user
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements sent to the test database
+
+    With parameters=True each entry is a (statement, parameters) pair.
+    """
+    @contextmanager
+    def _count_queries(parameters=False):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, statement_parameters, context, executemany):
+            statements.append((statement, statement_parameters) if parameters else statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return _count_queries
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Tests start it in a background thread with `run_fake_groq()` and point
+GROQ_BASE_URL at it. It can also be run on its own for benchmarks:
+
+    python -m tests.fake_groq --port 8100 --latency 2
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import List
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_STORIES = [
+    "As a manager, I want to create projects, so that work is organised.",
+    "As a developer, I want to see my tasks, so that I know what to do next.",
+    "As an admin, I want to manage users, so that access stays correct.",
+]
+
+
+class FakeGroq:
+    """Answers chat completions after `latency` seconds; the first `failures` requests get a 503.
+
+    Streamed completions (`"stream": true`) send the same content one story
+    line at a time, spreading `latency` evenly over the lines.
+    """
+
+    def __init__(self, latency: float = 0.0, failures: int = 0, stories: List[str] = DEFAULT_STORIES):
+        self.latency = latency
+        self.failures = failures
+        self.stories = stories
+        self.requests = 0
+        # Client address of every connection a request arrived on
+        self.connections = set()
+        self.app = self._make_app()
+
+    def _make_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/openai/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            self.requests += 1
+            self.connections.add((request.client.host, request.client.port))
+            if self.failures > 0:
+                self.failures -= 1
+                return JSONResponse({"error": {"message": "Service unavailable"}}, status_code=503)
+            if body.get("stream"):
+                return StreamingResponse(self.completion_chunks(body["model"]), media_type="text/event-stream")
+            await asyncio.sleep(self.latency)
+            return self.completion(body["model"])
+
+        return app
+
+    def content_lines(self) -> List[str]:
+        return [f"{number}. {story}" for number, story in enumerate(self.stories, start=1)]
+
+    async def completion_chunks(self, model: str):
+        lines = self.content_lines()
+        for index, line in enumerate(lines):
+            await asyncio.sleep(self.latency / len(lines))
+            # Split each line over two chunks so clients must reassemble them
+            piece = line if index == len(lines) - 1 else line + "\n"
+            middle = len(piece) // 2
+            for content in (piece[:middle], piece[middle:]):
+                yield self.chunk(model, {"content": content}, None)
+        yield self.chunk(model, {}, "stop")
+        yield "data: [DONE]\n\n"
+
+    def chunk(self, model: str, delta: dict, finish_reason) -> str:
+        chunk = {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    def completion(self, model: str) -> dict:
+        content = "\n".join(self.content_lines())
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 50, "total_tokens": 60},
+        }
+
+
+@contextmanager
+def run_fake_groq(port: int = 0, **options):
+    """Serve a FakeGroq in a background thread, yielding (base_url, fake)"""
+    fake = FakeGroq(**options)
+    server = uvicorn.Server(uvicorn.Config(fake.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}", fake
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds before each completion")
+    args = parser.parse_args()
+    uvicorn.run(FakeGroq(latency=args.latency).app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import json
+import time
+from contextlib import ExitStack
+import pytest
+from fastapi.testclient import TestClient
+from app import story_cache
+from app.config import settings
+from app.main import app
+from app.routers import ai
+from .fake_groq import DEFAULT_STORIES, run_fake_groq
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """Start a fake Groq server and point the shared client at it"""
+    with ExitStack() as stack:
+        def _fake_groq(**options):
+            base_url, fake = stack.enter_context(run_fake_groq(**options))
+            monkeypatch.setattr(settings, "GROQ_BASE_URL", base_url)
+            monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+            # Stories cached from earlier tests would never reach the new server
+            story_cache.memory_tier.clear()
+            return fake
+        yield _fake_groq
+
+
+def wait_for_job(client, job_id, headers):
+    for _ in range(500):
+        job = client.get(f"/api/ai/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_generate_and_save_runs_as_background_job(client, make_user, fake_groq):
+    fake = fake_groq()
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "AI project"}, headers=headers).json()
+
+    # The lifespan starts the job workers and closes the shared AI client on exit
+    with TestClient(app) as ai_client:
+        for version in range(3):
+            response = ai_client.post(
+                f"/api/ai/generate-and-save/{project['id']}",
+                json={"projectDescription": f"A project tool, version {version}"},
+                headers=headers
+            )
+            assert response.status_code == 202
+            assert response.json()["status"] == "queued"
+            job = wait_for_job(ai_client, response.json()["id"], headers)
+            assert job["status"] == "succeeded"
+            assert [story["story"] for story in job["stories"]] == DEFAULT_STORIES
+
+    assert fake.requests == 3
+    # Every completion went over the same kept-alive connection
+    assert len(fake.connections) == 1
+    stories = client.get(f"/api/ai/user-stories/{project['id']}", headers=headers).json()
+    assert len(stories) == 9
+
+
+def test_failed_job_reports_error(client, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", None)
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "No AI key"}, headers=headers).json()
+
+    with TestClient(app) as ai_client:
+        response = ai_client.post(
+            f"/api/ai/generate-and-save/{project['id']}?refresh=true",
+            json={"projectDescription": "Anything"},
+            headers=headers
+        )
+        job = wait_for_job(ai_client, response.json()["id"], headers)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "GROQ API key not configured"
+    assert job["stories"] == []
+
+
+def test_generate_retries_unavailable_service(client, make_user, fake_groq):
+    fake = fake_groq(failures=1)
+    _, headers = make_user("Manager")
+
+    with TestClient(app) as ai_client:
+        response = ai_client.post(
+            "/api/ai/generate-user-stories",
+            json={"projectDescription": "A project tool"},
+            headers=headers
+        )
+
+    assert response.status_code == 200
+    assert response.json() == DEFAULT_STORIES
+    assert fake.requests == 2
+
+
+def test_generated_stories_are_cached_by_normalized_description(client, make_user, fake_groq, tmp_path, monkeypatch):
+    fake = fake_groq()
+    monkeypatch.setattr(story_cache, "disk_tier", story_cache.SQLiteTier(str(tmp_path / "stories.db"), ttl=60))
+    _, headers = make_user("Manager")
+    url = "/api/ai/generate-user-stories"
+
+    with TestClient(app) as ai_client:
+        for description in ["A  project tool", "a project tool\n", "A project tool"]:
+            response = ai_client.post(url, json={"projectDescription": description}, headers=headers)
+            assert response.json() == DEFAULT_STORIES
+        assert fake.requests == 1
+
+        # The SQLite tier answers once the memory tier has forgotten the entry
+        story_cache.memory_tier.clear()
+        ai_client.post(url, json={"projectDescription": "A project tool"}, headers=headers)
+        assert fake.requests == 1
+
+        ai_client.post(f"{url}?refresh=true", json={"projectDescription": "A project tool"}, headers=headers)
+        assert fake.requests == 2
+
+
+def test_story_line_parser_handles_split_lines():
+    parser = ai.StoryLineParser()
+    stories = []
+    for chunk in ["1. As a us", "er, I want x\n2", ". As a dev, I want y\nNot a story\n- As a pm, ", "I want z"]:
+        stories += parser.feed(chunk)
+    assert stories == ["As a user, I want x", "As a dev, I want y"]
+    assert parser.close() == ["As a pm, I want z"]
+
+
+def test_stream_user_stories_as_server_sent_events(client, make_user, fake_groq):
+    fake = fake_groq()
+    _, headers = make_user("Manager")
+
+    with TestClient(app) as ai_client:
+        with ai_client.stream(
+            "POST",
+            "/api/ai/generate-user-stories/stream",
+            json={"projectDescription": "A streamed project"},
+            headers=headers
+        ) as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [block.splitlines() for block in response.read().decode().split("\n\n") if block]
+
+    assert [event for event, _ in events] == ["event: story"] * 3 + ["event: done"]
+    assert [json.loads(data[len("data: "):]) for _, data in events[:3]] == DEFAULT_STORIES
+    assert fake.requests == 1
+    # The streamed stories were cached for the non-streaming endpoint
+    assert client.post(
+        "/api/ai/generate-user-stories",
+        json={"projectDescription": "A streamed project"},
+        headers=headers
+    ).json() == DEFAULT_STORIES
+    assert fake.requests == 1
@@ -0,0 +1,69 @@
+import inspect
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app import async_routes
+from app.database import get_async_db
+from app.routers import auth, users, projects, tasks, ai, dashboard
+
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+
+async_app = FastAPI()
+for router in [auth.router, users.router, projects.router, tasks.router, ai.router, dashboard.router]:
+    async_app.include_router(async_routes.asyncify_router(router))
+async_app.dependency_overrides.update(async_routes.dependency_overrides())
+async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+def test_every_route_is_a_coroutine():
+    routes = [route for route in async_app.routes if isinstance(route, APIRoute)]
+    assert routes
+    assert all(inspect.iscoroutinefunction(route.endpoint) for route in routes)
+
+
+def test_async_request_path():
+    client = TestClient(async_app)
+    client.post(
+        "/api/auth/register",
+        json={
+            "email": "async@example.com",
+            "username": "asyncuser",
+            "full_name": "Async User",
+            "role": "Manager",
+            "password": "testpass123"
+        }
+    )
+    token = client.post(
+        "/api/auth/login", data={"username": "asyncuser", "password": "testpass123"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    me = client.get("/api/auth/me", headers=headers).json()
+
+    project = client.post(
+        "/api/projects/", json={"name": "Async project", "team_member_ids": [me["id"]]}, headers=headers
+    )
+    assert project.status_code == 201
+    project_id = project.json()["id"]
+
+    task = client.post(
+        "/api/tasks/", json={"title": "Async task", "project_id": project_id, "assignee_id": me["id"]}, headers=headers
+    )
+    assert task.status_code == 201
+
+    # Nested relationships are loaded lazily while the response is validated
+    fetched = client.get(f"/api/projects/{project_id}", headers=headers).json()
+    assert [member["username"] for member in fetched["team_members"]] == ["asyncuser"]
+    assert fetched["task_count"] == 1
+    my_tasks = client.get("/api/tasks/my-tasks", headers=headers).json()
+    assert my_tasks[0]["assignee"]["username"] == "asyncuser"
+
+    assert client.get("/api/dashboard/stats", headers=headers).json()["my_tasks"] == 1
+    assert client.delete(f"/api/projects/{project_id}", headers=headers).status_code == 204
@@ -0,0 +1,134 @@
+def test_bulk_create_tasks(client, make_user, count_queries):
+    assignee, manager_headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Bulk"}, headers=manager_headers).json()
+    tasks = [
+        {"title": f"Bulk {i}", "project_id": project["id"], "status": "Done" if i % 4 == 0 else "To Do",
+         "assignee_id": assignee["id"] if i % 2 else None}
+        for i in range(200)
+    ]
+
+    with count_queries() as statements:
+        response = client.post("/api/tasks/bulk", json={"tasks": tasks}, headers=manager_headers)
+    assert response.status_code == 201
+    created = response.json()
+    assert [task["title"] for task in created] == [task["title"] for task in tasks]
+    assert created[1]["assignee"]["id"] == assignee["id"]
+    # Statement count does not depend on the number of tasks
+    assert len(statements) <= 6
+
+    stats = client.get(f"/api/dashboard/project-stats/{project['id']}", headers=manager_headers).json()
+    assert (stats["total_tasks"], stats["completed_tasks"], stats["todo_tasks"]) == (200, 50, 150)
+
+
+def test_bulk_create_checks_every_project(client, make_user):
+    developer, developer_headers = make_user("Developer")
+    _, manager_headers = make_user("Manager")
+    member_project = client.post(
+        "/api/projects/", json={"name": "Mine", "team_member_ids": [developer["id"]]}, headers=manager_headers
+    ).json()
+    other_project = client.post("/api/projects/", json={"name": "Not mine"}, headers=manager_headers).json()
+
+    def bulk(project_ids):
+        tasks = [{"title": "Task", "project_id": project_id} for project_id in project_ids]
+        return client.post("/api/tasks/bulk", json={"tasks": tasks}, headers=developer_headers)
+
+    assert bulk([member_project["id"], other_project["id"]]).status_code == 403
+    assert bulk([member_project["id"], 999999]).status_code == 404
+    assert bulk([member_project["id"]] * 3).status_code == 201
+    assert len(client.get(f"/api/tasks/?project_id={other_project['id']}", headers=manager_headers).json()) == 0
+
+
+def test_batch_update_tasks(client, make_user, count_queries):
+    _, manager_headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Board"}, headers=manager_headers).json()
+    tasks = client.post(
+        "/api/tasks/bulk", json={"tasks": [{"title": f"Card {i}", "project_id": project["id"]} for i in range(50)]},
+        headers=manager_headers
+    ).json()
+    updates = [
+        {"id": task["id"], "fields": {"status": "Done" if i < 20 else "In Progress", "priority": "High"}}
+        for i, task in enumerate(tasks)
+    ] + [{"id": 999999, "fields": {"status": "Done"}}]
+
+    with count_queries() as statements:
+        response = client.patch("/api/tasks/batch", json={"updates": updates}, headers=manager_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 50
+    assert body["results"][-1] == {"id": 999999, "result": "not_found", "detail": "Task not found"}
+    # One UPDATE per distinct field set, not per task
+    assert len(statements) <= 6
+
+    stats = client.get(f"/api/dashboard/project-stats/{project['id']}", headers=manager_headers).json()
+    assert (stats["completed_tasks"], stats["in_progress_tasks"], stats["todo_tasks"]) == (20, 30, 0)
+
+    response = client.patch(
+        "/api/tasks/batch",
+        json={"filter": {"project_id": project["id"], "status": "In Progress"}, "fields": {"status": "Done"}},
+        headers=manager_headers
+    )
+    assert response.json()["updated"] == 30
+    assert response.json()["results"] == []
+    stats = client.get(f"/api/dashboard/project-stats/{project['id']}", headers=manager_headers).json()
+    assert stats["completed_tasks"] == 50
+
+    # The filter no longer matches once status is written; the new titles are still indexed
+    response = client.patch(
+        "/api/tasks/batch",
+        json={"filter": {"project_id": project["id"], "status": "Done"}, "fields": {"status": "To Do", "title": "Reopened"}},
+        headers=manager_headers
+    )
+    assert response.json()["updated"] == 50
+    stats = client.get(f"/api/dashboard/project-stats/{project['id']}", headers=manager_headers).json()
+    assert (stats["completed_tasks"], stats["todo_tasks"]) == (0, 50)
+    found = client.get(f"/api/search/?q=reopened&project_id={project['id']}&limit=100", headers=manager_headers).json()
+    assert len(found) == 50
+
+
+def test_batch_update_keeps_developer_rule(client, make_user):
+    developer, developer_headers = make_user("Developer")
+    _, manager_headers = make_user("Manager")
+    project = client.post(
+        "/api/projects/", json={"name": "Sprint", "team_member_ids": [developer["id"]]}, headers=manager_headers
+    ).json()
+    mine, theirs = client.post("/api/tasks/bulk", json={"tasks": [
+        {"title": "Mine", "project_id": project["id"], "assignee_id": developer["id"]},
+        {"title": "Theirs", "project_id": project["id"]},
+    ]}, headers=manager_headers).json()
+
+    response = client.patch("/api/tasks/batch", json={"updates": [
+        {"id": mine["id"], "fields": {"status": "Done", "title": "Renamed"}},
+        {"id": theirs["id"], "fields": {"status": "Done"}},
+    ]}, headers=developer_headers)
+    assert response.status_code == 200
+    assert [result["result"] for result in response.json()["results"]] == ["updated", "forbidden"]
+
+    updated = client.get(f"/api/tasks/{mine['id']}", headers=developer_headers).json()
+    assert (updated["status"], updated["title"]) == ("Done", "Mine")
+    assert client.get(f"/api/tasks/{theirs['id']}", headers=developer_headers).json()["status"] == "To Do"
+
+    # A developer's filter only matches their own tasks
+    response = client.patch(
+        "/api/tasks/batch", json={"filter": {"project_id": project["id"]}, "fields": {"status": "In Progress"}},
+        headers=developer_headers
+    )
+    assert response.json() == {"updated": 1, "results": []}
+    assert client.get(f"/api/tasks/{mine['id']}", headers=developer_headers).json()["status"] == "In Progress"
+    assert client.get(f"/api/tasks/{theirs['id']}", headers=developer_headers).json()["status"] == "To Do"
+    assert client.patch("/api/tasks/batch", json={"fields": {"status": "Done"}}, headers=developer_headers).status_code == 422
+
+
+def test_batch_update_rejects_null_required_fields(client, make_user):
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Nulls"}, headers=headers).json()
+    task = client.post("/api/tasks/", json={"title": "Kept", "project_id": project["id"]}, headers=headers).json()
+
+    for body in [
+        {"filter": {"project_id": project["id"]}, "fields": {"status": None}},
+        {"updates": [{"id": task["id"], "fields": {"status": None}}]},
+        {"updates": [{"id": task["id"], "fields": {"title": None}}]},
+    ]:
+        assert client.patch("/api/tasks/batch", json=body, headers=headers).status_code == 422
+    # Nullable fields can still be cleared
+    body = {"updates": [{"id": task["id"], "fields": {"description": None}}]}
+    assert client.patch("/api/tasks/batch", json=body, headers=headers).json()["updated"] == 1
@@ -0,0 +1,40 @@
+from app import models, counters
+
+
+def test_counters_follow_task_writes(client, make_user, db):
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Counted"}, headers=headers).json()
+
+    task_ids = [
+        client.post("/api/tasks/", json={"title": f"Task {i}", "project_id": project["id"]}, headers=headers).json()["id"]
+        for i in range(3)
+    ]
+    client.put(f"/api/tasks/{task_ids[0]}", json={"status": "Done"}, headers=headers)
+    client.put(f"/api/tasks/{task_ids[1]}", json={"status": "In Progress"}, headers=headers)
+    client.delete(f"/api/tasks/{task_ids[2]}", headers=headers)
+
+    counter = db.get(models.ProjectTaskCounter, project["id"])
+    assert (counter.todo_count, counter.in_progress_count, counter.done_count, counter.total_count) == (0, 1, 1, 2)
+    assert client.get(f"/api/projects/{project['id']}", headers=headers).json()["task_count"] == 2
+    assert counters.rebuild(db, verify_only=True) == []
+
+    client.delete(f"/api/projects/{project['id']}", headers=headers)
+    db.expire_all()
+    assert db.get(models.ProjectTaskCounter, project["id"]) is None
+
+
+def test_rebuild_reports_and_fixes_drift(client, make_user, db):
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Drifted"}, headers=headers).json()
+    client.post("/api/tasks/", json={"title": "Only task", "project_id": project["id"]}, headers=headers)
+
+    counter = db.get(models.ProjectTaskCounter, project["id"])
+    counter.todo_count = 5
+    db.commit()
+
+    assert counters.rebuild(db, verify_only=True) == [
+        {"project_id": project["id"], "field": "todo_count", "stored": 5, "actual": 1}
+    ]
+    counters.rebuild(db)
+    db.commit()
+    assert counters.rebuild(db, verify_only=True) == []
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+
+def test_dashboard_stats_scoped_to_developer_projects(client, make_user):
+    _, manager_headers = make_user("Manager")
+    developer, developer_headers = make_user("Developer")
+
+    member_project = client.post(
+        "/api/projects/",
+        json={"name": "Member project", "team_member_ids": [developer["id"]]},
+        headers=manager_headers
+    ).json()
+    other_project = client.post(
+        "/api/projects/",
+        json={"name": "Other project"},
+        headers=manager_headers
+    ).json()
+
+    yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    for task in [
+        {"title": "Overdue", "project_id": member_project["id"], "deadline": yesterday, "assignee_id": developer["id"]},
+        {"title": "Finished", "project_id": member_project["id"], "status": "Done", "deadline": yesterday},
+        {"title": "Hidden", "project_id": other_project["id"], "status": "In Progress", "deadline": yesterday},
+    ]:
+        assert client.post("/api/tasks/", json=task, headers=manager_headers).status_code == 201
+
+    response = client.get("/api/dashboard/stats", headers=developer_headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_projects": 1,
+        "total_tasks": 2,
+        "tasks_by_status": {"To Do": 1, "In Progress": 0, "Done": 1},
+        "overdue_tasks": 1,
+        "my_tasks": 1
+    }
+
+
+def test_dashboard_stats_single_round_trip(client, make_user, count_queries):
+    _, headers = make_user("Admin")
+
+    with count_queries() as statements:
+        response = client.get("/api/dashboard/stats", headers=headers)
+    assert response.status_code == 200
+    # One query to load the current user, one for every dashboard figure
+    assert len(statements) == 2
+
+    with count_queries() as statements:
+        response = client.get("/api/dashboard/stats", headers=headers)
+    assert response.status_code == 200
+    # The principal is cached from the first request
+    assert len(statements) == 1
+
+
+def test_project_stats_grouped_per_project(client, make_user):
+    _, manager_headers = make_user("Manager")
+    developer, developer_headers = make_user("Developer")
+
+    project_ids = []
+    for name, statuses in [("Stats A", ["Done", "Done", "To Do", "In Progress"]), ("Stats B", [])]:
+        project = client.post(
+            "/api/projects/",
+            json={"name": name, "team_member_ids": [developer["id"]]},
+            headers=manager_headers
+        ).json()
+        project_ids.append(project["id"])
+        for task_status in statuses:
+            client.post(
+                "/api/tasks/",
+                json={"title": task_status, "project_id": project["id"], "status": task_status},
+                headers=manager_headers
+            )
+
+    response = client.get("/api/dashboard/project-stats", headers=developer_headers)
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "project_id": project_ids[0],
+            "project_name": "Stats A",
+            "total_tasks": 4,
+            "completed_tasks": 2,
+            "in_progress_tasks": 1,
+            "todo_tasks": 1,
+            "overdue_tasks": 0,
+            "completion_percentage": 50.0
+        },
+        {
+            "project_id": project_ids[1],
+            "project_name": "Stats B",
+            "total_tasks": 0,
+            "completed_tasks": 0,
+            "in_progress_tasks": 0,
+            "todo_tasks": 0,
+            "overdue_tasks": 0,
+            "completion_percentage": 0.0
+        }
+    ]
+
+    page = client.get("/api/dashboard/project-stats?skip=1&limit=1", headers=developer_headers).json()
+    assert [row["project_id"] for row in page] == [project_ids[1]]
+
+    single = client.get(f"/api/dashboard/project-stats/{project_ids[0]}", headers=developer_headers)
+    assert single.json()["total_tasks"] == 4
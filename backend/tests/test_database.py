@@ -0,0 +1,45 @@
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+from app import database, metrics
+
+
+def test_pool_modes():
+    assert isinstance(database.create_db_engine("sqlite:///./test.db", "null").pool, NullPool)
+    assert isinstance(database.create_db_engine("sqlite:///./test.db", "external").pool, NullPool)
+
+    engine = database.create_db_engine("sqlite:///./test.db", "queue")
+    assert isinstance(engine.pool, database.TimedQueuePool)
+
+    checkouts = database.pool_checkouts.value
+    waits = database.pool_wait.count
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert database.pool_checkouts.value == checkouts + 2
+    assert database.pool_wait.count == waits + 2
+    # The second checkout reused the pooled connection
+    assert engine.pool.checkedin() == 1
+    engine.dispose()
+
+
+def test_pool_gauges_are_per_engine():
+    first = database.create_db_engine("sqlite:///./test.db", "queue")
+    second = database.create_db_engine("sqlite:///./test.db", "queue")
+    database.register_pool_gauge(first.pool, "first")
+    database.register_pool_gauge(second.pool, "second")
+    with first.connect():
+        snapshot = metrics.snapshot()
+    assert (snapshot["db_pool_checked_out_first"], snapshot["db_pool_checked_out_second"]) == (1, 0)
+    first.dispose()
+    second.dispose()
+
+
+def test_metrics_endpoint(client, make_user):
+    assert client.get("/metrics").status_code == 401
+    _, developer_headers = make_user("Developer")
+    assert client.get("/metrics", headers=developer_headers).status_code == 403
+    _, headers = make_user("Admin")
+    response = client.get("/metrics", headers=headers)
+    assert response.status_code == 200
+    assert "db_pool_wait_ms" in response.json()
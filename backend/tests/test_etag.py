@@ -0,0 +1,82 @@
+def get(client, url, headers, etag=None):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(url, headers=headers)
+
+
+def test_task_list_not_modified_until_a_task_changes(client, make_user, count_queries):
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Tagged"}, headers=headers).json()
+    task = client.post("/api/tasks/", json={"title": "Task", "project_id": project["id"]}, headers=headers).json()
+    url = f"/api/tasks/?project_id={project['id']}"
+
+    first = get(client, url, headers)
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    with count_queries() as statements:
+        response = get(client, url, headers, etag)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    # Only the fingerprint, aggregated over the page rather than the whole set; no task rows are loaded
+    assert len(statements) == 1
+    assert "LIMIT" in statements[0]
+
+    client.put(f"/api/tasks/{task['id']}", json={"title": "Renamed"}, headers=headers)
+    response = get(client, url, headers, etag)
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Renamed"
+
+    etag = response.headers["ETag"]
+    client.post("/api/tasks/", json={"title": "Another", "project_id": project["id"]}, headers=headers)
+    assert get(client, url, headers, etag).status_code == 200
+    # Another page of the same set has its own tag
+    assert get(client, url + "&limit=1", headers, etag).status_code == 200
+
+
+def test_task_list_follows_assignee_changes(client, make_user):
+    assignee, assignee_headers = make_user("Developer")
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Embedded"}, headers=headers).json()
+    client.post(
+        "/api/tasks/", json={"title": "Assigned", "project_id": project["id"], "assignee_id": assignee["id"]}, headers=headers
+    )
+    url = f"/api/tasks/?project_id={project['id']}"
+
+    etag = get(client, url, headers).headers["ETag"]
+    client.put(f"/api/users/{assignee['id']}", json={"full_name": "Renamed Developer"}, headers=assignee_headers)
+    response = get(client, url, headers, etag)
+    assert response.status_code == 200
+    assert response.json()[0]["assignee"]["full_name"] == "Renamed Developer"
+
+
+def test_detail_and_team_changes(client, make_user):
+    developer, developer_headers = make_user("Developer")
+    _, manager_headers = make_user("Manager")
+    project = client.post(
+        "/api/projects/", json={"name": "Team", "team_member_ids": [developer["id"]]}, headers=manager_headers
+    ).json()
+    url = f"/api/projects/{project['id']}"
+
+    etag = get(client, url, manager_headers).headers["ETag"]
+    assert get(client, url, manager_headers, etag).status_code == 304
+    # The tag is per user
+    assert get(client, url, developer_headers, etag).status_code == 200
+
+    client.put(url, json={"team_member_ids": []}, headers=manager_headers)
+    response = get(client, url, manager_headers, etag)
+    assert response.status_code == 200
+    assert response.json()["team_members"] == []
+    # Permissions are checked before answering 304
+    assert get(client, url, developer_headers).status_code == 403
+
+
+def test_dashboard_not_modified(client, make_user):
+    _, headers = make_user("Admin")
+    etag = get(client, "/api/dashboard/stats", headers).headers["ETag"]
+    assert get(client, "/api/dashboard/stats", headers, etag).status_code == 304
+    assert get(client, "/api/dashboard/stats", headers, f'"other", {etag}').status_code == 304
+
+    project = client.post("/api/projects/", json={"name": "Counted"}, headers=headers).json()
+    client.post("/api/tasks/", json={"title": "Task", "project_id": project["id"]}, headers=headers)
+    assert get(client, "/api/dashboard/stats", headers, etag).status_code == 200
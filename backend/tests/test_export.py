@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from app import export
+
+
+def make_project(client, make_user):
+    developer, developer_headers = make_user("Developer")
+    _, headers = make_user("Manager")
+    project = client.post(
+        "/api/projects/", json={"name": "Export", "team_member_ids": [developer["id"]]}, headers=headers
+    ).json()
+    tasks = client.post("/api/tasks/bulk", json={"tasks": [
+        {"title": f"Task {i}", "project_id": project["id"], "assignee_id": developer["id"] if i % 2 else None}
+        for i in range(5)
+    ]}, headers=headers).json()
+    for task in (tasks[1], tasks[3], tasks[3]):
+        client.post(f"/api/tasks/{task['id']}/comments", json={"content": f"On {task['title']}"}, headers=headers)
+    return project, tasks, developer, developer_headers, headers
+
+
+def test_export_ndjson_with_comments(client, make_user, monkeypatch):
+    # Small batches so the export spans several fetches and chunks
+    monkeypatch.setattr(export, "BATCH_SIZE", 2)
+    project, tasks, developer, developer_headers, _ = make_project(client, make_user)
+
+    response = client.get(
+        f"/api/projects/{project['id']}/export?include_comments=true", headers=developer_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [task["id"] for task in tasks]
+    assert rows[1]["assignee"] == developer["username"]
+    assert rows[0]["status"] == "To Do"
+    assert [len(row["comments"]) for row in rows] == [0, 1, 0, 2, 0]
+    assert rows[3]["comments"][0]["content"] == "On Task 3"
+
+
+def test_export_csv_and_permissions(client, make_user):
+    project, tasks, _, _, headers = make_project(client, make_user)
+    response = client.get(f"/api/projects/{project['id']}/export?format=csv", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == [task["title"] for task in tasks]
+    assert "comments" not in rows[0]
+
+    _, outsider_headers = make_user("Developer")
+    assert client.get(f"/api/projects/{project['id']}/export", headers=outsider_headers).status_code == 403
+    assert client.get("/api/projects/999999/export", headers=headers).status_code == 404
+    assert client.get(f"/api/projects/{project['id']}/export?format=xml", headers=headers).status_code == 422
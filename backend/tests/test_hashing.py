@@ -0,0 +1,19 @@
+from app import hashing
+
+
+def test_login_fails_fast_when_hash_queue_is_full(client, make_user, monkeypatch):
+    user, _ = make_user("Developer")
+    credentials = {"username": user["username"], "password": "testpass123"}
+    monkeypatch.setattr("app.hashing.settings.PASSWORD_HASH_QUEUE_LIMIT", 0)
+    monkeypatch.setattr(hashing, "_in_flight", hashing.settings.PASSWORD_HASH_WORKERS)
+    rejected = hashing.rejected.value
+
+    response = client.post("/api/auth/login", data=credentials)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert hashing.rejected.value == rejected + 1
+
+    monkeypatch.setattr(hashing, "_in_flight", 0)
+    verified = hashing.verify_latency.count
+    assert client.post("/api/auth/login", data=credentials).status_code == 200
+    assert hashing.verify_latency.count == verified + 1
@@ -0,0 +1,102 @@
+import json
+from app import task_import
+
+
+def test_import_ndjson_reports_bad_rows(client, make_user, monkeypatch):
+    # Small batches so the import spans several transactions
+    monkeypatch.setattr(task_import, "BATCH_SIZE", 2)
+    assignee, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Migrated"}, headers=headers).json()
+    lines = [
+        {"title": "First", "assignee": assignee["username"], "status": "Done"},
+        {"title": "Second", "assignee_id": assignee["id"], "deadline": "2030-01-02T03:04:05Z"},
+        {"title": "Unknown user", "assignee": "nobody-by-this-name"},
+        {"status": "Done"},
+        {"title": "Third", "project_id": 999999},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{not json\n\n"
+
+    response = client.post(f"/api/projects/{project['id']}/import", content=body.encode(), headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (3, 3)
+    assert [error["row"] for error in result["errors"]] == [3, 4, 6]
+    assert "nobody-by-this-name" in result["errors"][0]["detail"]
+    assert result["errors"][1]["detail"].startswith("title")
+
+    tasks = client.get(f"/api/tasks/?project_id={project['id']}", headers=headers).json()
+    assert [task["title"] for task in tasks] == ["First", "Second", "Third"]
+    assert tasks[0]["assignee"]["id"] == assignee["id"]
+    stats = client.get(f"/api/dashboard/project-stats/{project['id']}", headers=headers).json()
+    assert (stats["total_tasks"], stats["completed_tasks"]) == (3, 1)
+
+
+def test_import_csv_round_trips_export(client, make_user):
+    _, headers = make_user("Manager")
+    source = client.post("/api/projects/", json={"name": "Source"}, headers=headers).json()
+    target = client.post("/api/projects/", json={"name": "Target"}, headers=headers).json()
+    client.post("/api/tasks/bulk", json={"tasks": [
+        {"title": "Plain", "project_id": source["id"]},
+        {"title": "Multi-line", "description": 'Has "quotes",\ncommas and\nnewlines', "project_id": source["id"]},
+    ]}, headers=headers)
+    exported = client.get(f"/api/projects/{source['id']}/export?format=csv", headers=headers).content
+
+    response = client.post(f"/api/projects/{target['id']}/import?format=csv", content=exported, headers=headers)
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+    tasks = client.get(f"/api/tasks/?project_id={target['id']}", headers=headers).json()
+    assert tasks[1]["description"] == 'Has "quotes",\ncommas and\nnewlines'
+
+
+def test_import_checks_project(client, make_user):
+    _, manager_headers = make_user("Manager")
+    _, developer_headers = make_user("Developer")
+    project = client.post("/api/projects/", json={"name": "Closed"}, headers=manager_headers).json()
+    body = b'{"title": "Sneaky"}\n'
+    assert client.post(f"/api/projects/{project['id']}/import", content=body, headers=developer_headers).status_code == 403
+    assert client.post("/api/projects/999999/import", content=body, headers=manager_headers).status_code == 404
+
+
+def test_import_csv_keeps_stray_quotes_and_line_breaks(client, make_user):
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Quoted"}, headers=headers).json()
+    rows = ['5" screen,x'] + [f"Row {i},Plain" for i in range(5)] + ['Multi,"first\r\nsecond"']
+    body = "title,description\r\n" + "\r\n".join(rows) + "\r\n"
+
+    response = client.post(f"/api/projects/{project['id']}/import?format=csv", content=body.encode(), headers=headers)
+    assert response.json() == {"imported": 7, "failed": 0, "errors": []}
+    tasks = client.get(f"/api/tasks/?project_id={project['id']}", headers=headers).json()
+    assert tasks[0]["title"] == '5" screen'
+    assert tasks[-1]["description"] == "first\r\nsecond"
+
+
+def test_import_csv_limits_unterminated_quotes(client, make_user, monkeypatch):
+    monkeypatch.setattr(task_import, "MAX_RECORD_LINES", 3)
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Runaway"}, headers=headers).json()
+    body = 'title,description\n"Open,x\nA,a\nB,b\nC,c\nD,d\n'
+
+    response = client.post(f"/api/projects/{project['id']}/import?format=csv", content=body.encode(), headers=headers)
+    assert response.json() == {
+        "imported": 2, "failed": 1,
+        "errors": [{"row": 1, "detail": "Could not parse row: Quoted field is too long or not terminated"}]
+    }
+
+
+def test_import_skips_oversized_rows_without_buffering_them(client, make_user, monkeypatch):
+    monkeypatch.setattr(task_import, "MAX_RECORD_SIZE", 100)
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Oversized"}, headers=headers).json()
+    huge = json.dumps({"title": "x" * 1000}).encode()
+
+    def body():
+        yield b'{"title": "Before"}\n'
+        # Arrives in pieces with no line break; only MAX_RECORD_SIZE of it is ever pending
+        for start in range(0, len(huge), 64):
+            yield huge[start:start + 64]
+        yield b'\n{"title": "After"}\n' + huge
+
+    response = client.post(f"/api/projects/{project['id']}/import", content=body(), headers=headers)
+    assert response.json() == {"imported": 2, "failed": 2, "errors": [
+        {"row": 2, "detail": "Could not parse row: Row is longer than 100 characters"},
+        {"row": 4, "detail": "Could not parse row: Row is longer than 100 characters"},
+    ]}
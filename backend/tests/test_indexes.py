@@ -0,0 +1,48 @@
+"""EXPLAIN checks that the hot task queries are served by the task access indexes"""
+from datetime import datetime, timedelta
+from .conftest import engine
+
+
+def query_plans(queries):
+    with engine.connect() as conn:
+        return [
+            " | ".join(row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+            for statement, parameters in queries
+            if statement.lstrip().upper().startswith("SELECT")
+        ]
+
+
+def plan_using(plans, table, index_name):
+    return [plan for plan in plans if f"{table} USING" in plan and index_name in plan]
+
+
+def test_hot_task_queries_use_indexes(client, make_user, count_queries):
+    _, manager_headers = make_user("Manager")
+    developer, developer_headers = make_user("Developer")
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Indexed", "team_member_ids": [developer["id"]]},
+        headers=manager_headers
+    ).json()
+    yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    client.post(
+        "/api/tasks/",
+        json={"title": "Indexed task", "project_id": project["id"], "assignee_id": developer["id"], "deadline": yesterday},
+        headers=manager_headers
+    )
+
+    with count_queries(parameters=True) as queries:
+        client.get(f"/api/tasks/?project_id={project['id']}", headers=manager_headers)
+    assert plan_using(query_plans(queries), "tasks", "ix_tasks_project_id_status")
+
+    with count_queries(parameters=True) as queries:
+        client.get("/api/tasks/my-tasks", headers=developer_headers)
+    assert plan_using(query_plans(queries), "tasks", "ix_tasks_assignee_id_status")
+
+    with count_queries(parameters=True) as queries:
+        client.get("/api/dashboard/stats", headers=manager_headers)
+    assert plan_using(query_plans(queries), "tasks", "ix_tasks_open_deadline")
+
+    with count_queries(parameters=True) as queries:
+        client.get("/api/dashboard/stats", headers=developer_headers)
+    assert plan_using(query_plans(queries), "project_members", "ix_project_members_user_id")
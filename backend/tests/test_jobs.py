@@ -0,0 +1,38 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app import jobs, models
+
+
+def test_claim_and_requeue_stale_jobs(db, monkeypatch):
+    monkeypatch.setattr("app.jobs.settings.AI_JOB_MAX_ATTEMPTS", 2)
+    long_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    stale = models.Job(kind="test", status=models.JobStatus.RUNNING, payload={}, attempts=1, started_at=long_ago)
+    exhausted = models.Job(kind="test", status=models.JobStatus.RUNNING, payload={}, attempts=2, started_at=long_ago)
+    queued = jobs.enqueue(db, "test", {"n": 1})
+    db.add_all([stale, exhausted])
+    db.commit()
+
+    assert jobs.requeue_stale(db) == 2
+    db.expire_all()
+    assert (stale.status, exhausted.status) == (models.JobStatus.QUEUED, models.JobStatus.FAILED)
+
+    # Oldest first, each job claimed once
+    claimed = [jobs.claim_next(db), jobs.claim_next(db)]
+    assert [job.id for job in claimed] == [queued.id, stale.id]
+    assert [job.attempts for job in claimed] == [1, 2]
+    assert all(job.status == models.JobStatus.RUNNING for job in claimed)
+
+
+def test_idle_workers_keep_requeueing_stale_jobs(monkeypatch):
+    checks = []
+    monkeypatch.setattr(jobs, "requeue_stale", lambda db: checks.append(db) or 0)
+    worker = jobs.Worker(2, poll_interval=0.01, stale_check_interval=0.05)
+
+    async def idle():
+        await worker.start()
+        await asyncio.sleep(0.3)
+        await worker.stop()
+
+    asyncio.run(idle())
+    # Once at start, then every stale_check_interval while the app runs, not once per loop and poll
+    assert 4 <= len(checks) <= 8
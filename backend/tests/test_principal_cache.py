@@ -0,0 +1,57 @@
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app import auth
+from app.cache import TTLCache
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache("test_ttl", maxsize=2, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    assert cache.get("a") == 1
+    now[0] += 5
+    assert cache.get("b") is None
+
+    cache.set("c", 3)
+    cache.set("d", 4)
+    # "a" was least recently used and is evicted by the size bound
+    assert cache.get("a") is None
+    assert (cache.get("c"), cache.get("d")) == (3, 4)
+    assert cache.hits.value == 3
+    assert cache.misses.value == 2
+
+
+def test_role_change_invalidates_cached_principal(client, make_user):
+    _, admin_headers = make_user("Admin")
+    developer, developer_headers = make_user("Developer")
+
+    assert client.get("/api/users/", headers=developer_headers).status_code == 403
+    assert auth.principal_cache.get(developer["id"]).role.value == "Developer"
+
+    response = client.put(f"/api/users/{developer['id']}", json={"role": "Manager"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/api/users/", headers=developer_headers).status_code == 200
+
+    assert client.delete(f"/api/users/{developer['id']}", headers=admin_headers).status_code == 204
+    assert client.get("/api/users/", headers=developer_headers).status_code == 401
+
+
+def test_verified_token_cached_until_expiry(monkeypatch):
+    token = auth.create_access_token({"sub": "42"})
+    decode_calls = []
+    backend = auth.jwt_backend
+    monkeypatch.setattr(auth, "jwt_backend", backend._replace(
+        decode=lambda *args: decode_calls.append(args) or backend.decode(*args)
+    ))
+
+    assert auth.get_token_user_id(token) == 42
+    assert auth.get_token_user_id(token) == 42
+    assert len(decode_calls) == 1
+
+    expired = auth.create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        auth.get_token_user_id(expired)
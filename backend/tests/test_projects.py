@@ -0,0 +1,40 @@
+def test_project_list_query_count_is_constant(client, make_user, count_queries):
+    _, headers = make_user("Admin")
+    member, _ = make_user("Developer")
+    for i in range(5):
+        project = client.post(
+            "/api/projects/",
+            json={"name": f"Listed {i}", "team_member_ids": [member["id"]]},
+            headers=headers
+        ).json()
+        client.post("/api/tasks/", json={"title": "Task", "project_id": project["id"]}, headers=headers)
+
+    query_counts = []
+    for limit in (1, 5):
+        with count_queries() as statements:
+            response = client.get(f"/api/projects/?limit={limit}", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        query_counts.append(len(statements))
+
+    # ETag fingerprint, projects with task counts, team members (the current user is cached)
+    assert query_counts == [3, 3]
+
+
+def test_membership_check_follows_team_changes(client, make_user, monkeypatch):
+    _, manager_headers = make_user("Manager")
+    developer, developer_headers = make_user("Developer")
+    project = client.post("/api/projects/", json={"name": "Team changes"}, headers=manager_headers).json()
+    url = f"/api/projects/{project['id']}"
+
+    assert client.get(url, headers=developer_headers).status_code == 403
+    client.put(url, json={"team_member_ids": [developer["id"]]}, headers=manager_headers)
+    assert client.get(url, headers=developer_headers).status_code == 200
+    client.put(url, json={"team_member_ids": []}, headers=manager_headers)
+    assert client.get(url, headers=developer_headers).status_code == 403
+
+    # Without the cache every check is answered by the database
+    monkeypatch.setattr("app.membership.settings.MEMBERSHIP_CACHE_TTL", 0)
+    assert client.get(url, headers=developer_headers).status_code == 403
+    client.put(url, json={"team_member_ids": [developer["id"]]}, headers=manager_headers)
+    assert client.get(url, headers=developer_headers).status_code == 200
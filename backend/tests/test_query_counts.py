@@ -0,0 +1,100 @@
+"""
+Every list endpoint answers in a number of queries that does not depend on
+how many items it returns. The endpoints are discovered from the app, so a
+new list endpoint fails here until it has an entry in LIST_URLS.
+"""
+import typing
+from fastapi.routing import APIRoute
+from app import eager, models, schemas
+from app.main import app
+
+# Route path -> URL to request, formatted with the seeded project and task
+LIST_URLS = {
+    "/api/tasks/": "/api/tasks/?project_id={project}",
+    "/api/tasks/my-tasks": "/api/tasks/my-tasks",
+    "/api/tasks/{task_id}/comments": "/api/tasks/{task}/comments",
+    "/api/projects/": "/api/projects/",
+    "/api/users/": "/api/users/",
+    "/api/ai/user-stories/{project_id}": "/api/ai/user-stories/{project}",
+    "/api/dashboard/project-stats": "/api/dashboard/project-stats",
+    "/api/search/": "/api/search/?q=growing",
+}
+
+
+def list_routes():
+    return {
+        route.path for route in app.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods and typing.get_origin(route.response_model) is list
+    }
+
+
+def test_every_list_endpoint_is_checked():
+    assert list_routes() == set(LIST_URLS)
+
+
+def test_list_query_counts_do_not_grow_with_page_size(client, make_user, db, count_queries):
+    admin, headers = make_user("Admin")
+    developer, developer_headers = make_user("Developer")
+    project = client.post(
+        "/api/projects/", json={"name": "Counted", "team_member_ids": [developer["id"]]}, headers=headers
+    ).json()
+    task = client.post("/api/tasks/", json={"title": "Counted", "project_id": project["id"]}, headers=headers).json()
+
+    def grow(rounds: int):
+        # A different user per round, so lazy loads would not be hidden by the identity map
+        for i in range(rounds):
+            member, member_headers = make_user("Developer")
+            client.post(
+                "/api/projects/", json={"name": f"Growing {i}", "team_member_ids": [member["id"], developer["id"]]},
+                headers=headers
+            )
+            for assignee in (member, developer):
+                client.post("/api/tasks/", json={
+                    "title": "Growing task", "project_id": project["id"], "assignee_id": assignee["id"]
+                }, headers=headers)
+            client.post(f"/api/tasks/{task['id']}/comments", json={"content": "Growing thread"}, headers=member_headers)
+            db.add(models.UserStory(story=f"Story {i}", project_id=project["id"], creator_id=member["id"]))
+        db.commit()
+
+    def measure():
+        results = {}
+        for path, url in LIST_URLS.items():
+            url = url.format(project=project["id"], task=task["id"])
+            user_headers = developer_headers if path == "/api/tasks/my-tasks" else headers
+            # Once unmeasured, so cached principals and memberships are the same for both measurements
+            client.get(url, headers=user_headers)
+            with count_queries() as statements:
+                response = client.get(url, headers=user_headers)
+            assert response.status_code == 200, path
+            results[path] = (len(statements), len(response.json()))
+        return results
+
+    grow(1)
+    small = measure()
+    grow(4)
+    large = measure()
+
+    for path in LIST_URLS:
+        assert large[path][1] > small[path][1], path
+        assert large[path][0] == small[path][0], f"{path}: {small[path][0]} queries for {small[path][1]} items, {large[path][0]} for {large[path][1]}"
+
+
+def planned(options) -> set:
+    """(relationship path, loader strategy) of each loader in a tree of options"""
+    return {
+        (".".join(prop.key for prop in context.path[1::2]), dict(context.strategy)["lazy"])
+        for option in options for context in option.context
+    }
+
+
+def test_load_options_follow_response_schemas():
+    assert planned(eager.load_options(schemas.TaskResponse, models.Task)) == {("assignee", "joined")}
+    assert planned(eager.load_options(schemas.ProjectResponse, models.Project)) == {("team_members", "selectin")}
+
+    # A nested field added to a schema is planned without touching the endpoints, at any depth
+    class CommentWithTask(schemas.CommentResponse):
+        task: schemas.TaskResponse
+
+    assert planned(eager.load_options(CommentWithTask, models.Comment)) == {
+        ("author", "joined"), ("task", "joined"), ("task.assignee", "joined")
+    }
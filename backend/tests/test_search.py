@@ -0,0 +1,59 @@
+from app import search
+
+
+def test_search_ranks_and_follows_writes(client, make_user):
+    _, headers = make_user("Manager")
+    project = client.post(
+        "/api/projects/", json={"name": "Payments revamp", "description": "Rebuild checkout"}, headers=headers
+    ).json()
+    titled = client.post("/api/tasks/", json={
+        "title": "Refund workflow", "description": "Handle partial payments", "project_id": project["id"]
+    }, headers=headers).json()
+    described = client.post("/api/tasks/", json={
+        "title": "Email templates", "description": "Mention the refund policy", "project_id": project["id"]
+    }, headers=headers).json()
+    client.post(f"/api/tasks/{described['id']}/comments", json={"content": "Refunds need legal review"}, headers=headers)
+
+    results = client.get("/api/search/?q=refund", headers=headers).json()
+    # Title matches rank above body matches; "refunds" matches by stem and prefix
+    assert [(result["kind"], result["id"]) for result in results][:1] == [("task", titled["id"])]
+    assert {result["kind"] for result in results} == {"task", "comment"}
+    assert "[" in results[0]["snippet"] or results[0]["title"] == "Refund workflow"
+
+    assert client.get("/api/search/?q=checkout&kind=project", headers=headers).json()[0]["id"] == project["id"]
+    # Operators and punctuation are not query syntax
+    assert client.get('/api/search/?q="refund" AND (', headers=headers).status_code == 200
+
+    client.put(f"/api/tasks/{titled['id']}", json={"title": "Chargeback workflow"}, headers=headers)
+    assert [r["id"] for r in client.get("/api/search/?q=chargeback", headers=headers).json()] == [titled["id"]]
+    client.delete(f"/api/tasks/{described['id']}", headers=headers)
+    assert client.get("/api/search/?q=refund", headers=headers).json() == []
+
+
+def test_search_applies_visibility(client, make_user):
+    developer, developer_headers = make_user("Developer")
+    _, manager_headers = make_user("Manager")
+    mine = client.post(
+        "/api/projects/", json={"name": "Zebra mine", "team_member_ids": [developer["id"]]}, headers=manager_headers
+    ).json()
+    other = client.post("/api/projects/", json={"name": "Zebra other"}, headers=manager_headers).json()
+    assigned = client.post("/api/tasks/", json={
+        "title": "Zebra assigned", "project_id": other["id"], "assignee_id": developer["id"]
+    }, headers=manager_headers).json()
+    client.post("/api/tasks/", json={"title": "Zebra hidden", "project_id": other["id"]}, headers=manager_headers)
+
+    visible = {(r["kind"], r["id"]) for r in client.get("/api/search/?q=zebra", headers=developer_headers).json()}
+    assert visible == {("project", mine["id"]), ("task", assigned["id"])}
+    assert len(client.get("/api/search/?q=zebra", headers=manager_headers).json()) == 4
+
+
+def test_rebuild_recreates_documents(client, db, make_user):
+    _, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Quokka"}, headers=headers).json()
+    client.post("/api/tasks/", json={"title": "Quokka task", "project_id": project["id"]}, headers=headers)
+    before = {(r["kind"], r["id"]) for r in client.get("/api/search/?q=quokka", headers=headers).json()}
+    assert len(before) == 2
+
+    assert search.rebuild(db) >= 2
+    db.commit()
+    assert {(r["kind"], r["id"]) for r in client.get("/api/search/?q=quokka", headers=headers).json()} == before
@@ -0,0 +1,38 @@
+from app import models, schemas
+
+
+def test_task_list_matches_validated_response(client, db, make_user):
+    assignee, headers = make_user("Manager")
+    project = client.post("/api/projects/", json={"name": "Fast"}, headers=headers).json()
+    client.post("/api/tasks/", json={
+        "title": "Assigned", "project_id": project["id"], "assignee_id": assignee["id"],
+        "deadline": "2030-01-02T03:04:05.123456Z", "status": "In Progress"
+    }, headers=headers)
+    task = client.post("/api/tasks/", json={"title": "Unassigned", "project_id": project["id"]}, headers=headers).json()
+    client.put(f"/api/tasks/{task['id']}", json={"priority": "High"}, headers=headers)
+
+    response = client.get(f"/api/tasks/?project_id={project['id']}", headers=headers)
+    assert response.status_code == 200
+    expected = [
+        schemas.TaskResponse.model_validate(task).model_dump(mode="json")
+        for task in db.query(models.Task).filter(models.Task.project_id == project["id"]).order_by(models.Task.id)
+    ]
+    assert response.json() == expected
+    assert response.json()[0]["assignee"]["username"] == assignee["username"]
+    assert response.json()[1]["assignee"] is None
+
+
+def test_project_list_matches_validated_response(client, db, make_user):
+    _, headers = make_user("Admin")
+    members = [make_user("Developer")[0] for _ in range(2)]
+    created = client.post(
+        "/api/projects/", json={"name": "Team", "team_member_ids": [member["id"] for member in members]}, headers=headers
+    ).json()
+    client.post("/api/tasks/", json={"title": "Counted", "project_id": created["id"]}, headers=headers)
+
+    listed = {project["id"]: project for project in client.get("/api/projects/", headers=headers).json()}
+    project = db.get(models.Project, created["id"])
+    project.task_count = 1
+    expected = schemas.ProjectResponse.model_validate(project).model_dump(mode="json")
+    expected["team_members"].sort(key=lambda member: member["id"])
+    assert listed[created["id"]] == expected
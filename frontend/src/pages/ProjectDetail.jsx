@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, Link, useNavigate } from 'react-router-dom';
 import { projectsAPI, tasksAPI, aiAPI, dashboardAPI } from '../services/api';
 import { useAuth } from '../context/AuthContext';
@@ -35,11 +35,15 @@ const ProjectDetail = () => {
     end_date: ''
   });
   const { user } = useAuth();
+  // Stops polling a story generation job when the page goes away
+  const jobPolling = useRef(null);
 
   useEffect(() => {
     loadProjectData();
   }, [id]);
 
+  useEffect(() => () => jobPolling.current?.abort(), []);
+
   const loadProjectData = async () => {
     try {
       const [projectRes, tasksRes, statsRes] = await Promise.all([
@@ -67,16 +71,20 @@ const ProjectDetail = () => {
 
   const handleGenerateStories = async () => {
     setAiLoading(true);
+    const polling = new AbortController();
+    jobPolling.current = polling;
     try {
-      await aiAPI.generateAndSave(id, aiDescription);
+      const { data: job } = await aiAPI.generateAndSave(id, aiDescription);
+      await aiAPI.waitForJob(job.id, { signal: polling.signal });
       setShowAIModal(false);
       setAiDescription('');
       loadProjectData();
     } catch (error) {
+      if (polling.signal.aborted) return;
       console.error('Failed to generate stories:', error);
-      alert('Failed to generate user stories. Make sure GROQ API key is configured.');
+      alert(`Failed to generate user stories: ${error.message}. Make sure GROQ API key is configured.`);
     } finally {
-      setAiLoading(false);
+      if (!polling.signal.aborted) setAiLoading(false);
     }
   };
 
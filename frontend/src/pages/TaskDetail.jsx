@@ -5,10 +5,17 @@ import { useAuth } from '../context/AuthContext';
 import { ArrowLeft, MessageSquare, Send } from 'lucide-react';
 import { format } from 'date-fns';
 
+// Cursor of the next page from a `Link: <...?after=...>; rel="next"` header
+const nextCursor = (link) => {
+  const match = link && link.match(/<([^>]+)>;\s*rel="next"/);
+  return match ? new URL(match[1]).searchParams.get('after') : null;
+};
+
 const TaskDetail = () => {
   const { id } = useParams();
   const [task, setTask] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsAfter, setCommentsAfter] = useState(null);
   const [newComment, setNewComment] = useState('');
   const [loading, setLoading] = useState(true);
   const [updating, setUpdating] = useState(false);
@@ -27,6 +34,7 @@ const TaskDetail = () => {
       ]);
       setTask(taskRes.data);
       setComments(commentsRes.data);
+      setCommentsAfter(nextCursor(commentsRes.headers.link));
     } catch (error) {
       console.error('Failed to load task:', error);
     } finally {
@@ -34,6 +42,16 @@ const TaskDetail = () => {
     }
   };
 
+  const loadMoreComments = async () => {
+    try {
+      const response = await tasksAPI.getComments(id, { after: commentsAfter });
+      setComments([...comments, ...response.data]);
+      setCommentsAfter(nextCursor(response.headers.link));
+    } catch (error) {
+      console.error('Failed to load comments:', error);
+    }
+  };
+
   const handleStatusChange = async (newStatus) => {
     setUpdating(true);
     try {
@@ -53,7 +71,11 @@ const TaskDetail = () => {
 
     try {
       const response = await tasksAPI.addComment(id, newComment);
-      setComments([...comments, response.data]);
+      // Only show it now if the thread is loaded up to the end
+      if (!commentsAfter) {
+        setComments([...comments, response.data]);
+      }
+      setTask({ ...task, comment_count: task.comment_count + 1 });
       setNewComment('');
     } catch (error) {
       console.error('Failed to add comment:', error);
@@ -195,7 +217,7 @@ const TaskDetail = () => {
         <div className="flex items-center space-x-2 mb-4">
           <MessageSquare className="text-vintage-brown" size={24} />
           <h2 className="text-xl font-serif font-bold text-vintage-darkbrown">
-            Comments ({comments.length})
+            Comments ({task.comment_count})
           </h2>
         </div>
 
@@ -242,6 +264,15 @@ const TaskDetail = () => {
               <p className="font-serif text-vintage-brown">{comment.content}</p>
             </div>
           ))}
+          {commentsAfter && (
+            <button
+              type="button"
+              onClick={loadMoreComments}
+              className="w-full py-2 border-2 border-vintage-brown rounded font-serif text-vintage-brown hover:bg-vintage-cream transition-colors"
+            >
+              Load more comments
+            </button>
+          )}
           {comments.length === 0 && (
             <p className="text-center text-vintage-brown font-serif py-4">
               No comments yet. Be the first to comment!
@@ -58,7 +58,7 @@ export const tasksAPI = {
   update: (id, data) => api.put(`/api/tasks/${id}`, data),
   delete: (id) => api.delete(`/api/tasks/${id}`),
   addComment: (taskId, content) => api.post(`/api/tasks/${taskId}/comments`, { content }),
-  getComments: (taskId) => api.get(`/api/tasks/${taskId}/comments`),
+  getComments: (taskId, params) => api.get(`/api/tasks/${taskId}/comments`, { params }),
 };
 
 // AI API
@@ -67,6 +67,27 @@ export const aiAPI = {
     api.post('/api/ai/generate-user-stories', { projectDescription }),
   generateAndSave: (projectId, projectDescription) => 
     api.post(`/api/ai/generate-and-save/${projectId}`, { projectDescription }),
+  getJob: (jobId) => api.get(`/api/ai/jobs/${jobId}`),
+  // Poll a background job until it succeeds (resolves with the job) or fails (rejects).
+  // Gives up after timeoutMs, e.g. when no worker is running; abort signal stops polling.
+  waitForJob: async (jobId, { intervalMs = 1000, timeoutMs = 120000, signal } = {}) => {
+    const deadline = Date.now() + timeoutMs;
+    for (;;) {
+      const { data: job } = await api.get(`/api/ai/jobs/${jobId}`, { signal });
+      if (job.status === 'succeeded') return job;
+      if (job.status === 'failed') throw new Error(job.error || 'Job failed');
+      if (Date.now() + intervalMs > deadline) {
+        throw new Error('The job is taking too long; it may still finish later, check back in a while');
+      }
+      await new Promise((resolve, reject) => {
+        const timer = setTimeout(resolve, intervalMs);
+        signal?.addEventListener('abort', () => {
+          clearTimeout(timer);
+          reject(new DOMException('Polling stopped', 'AbortError'));
+        }, { once: true });
+      });
+    }
+  },
   getUserStories: (projectId) => api.get(`/api/ai/user-stories/${projectId}`),
 };
 